@@ -0,0 +1,181 @@
+# resume_screening/benchmarks/bench_hot_paths.py
+#
+# Times the screening hot paths at several batch sizes and writes the results as JSON:
+#   python benchmarks/bench_hot_paths.py [--batch-sizes 1 10 100 1000] [--repeat 5] [--stages ...]
+# Compare two runs with benchmarks/compare.py. MongoDB is replaced by mongomock, so
+# no server (or network) is needed.
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import tempfile
+import subprocess
+import tracemalloc
+import warnings
+from datetime import datetime, timezone
+
+import numpy as np
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+from benchmarks.synthetic import make_resume_text, make_job_description, make_pdf
+from utils.extract_text import clean_text, clean_texts
+from utils.skill_matcher import matcher_for
+
+BATCH_SIZES = [1, 10, 100, 1000]
+RESULTS_DIR = os.path.join(PROJECT_ROOT, "benchmarks", "results")
+
+
+def load_app():
+    """Imports webapp/app.py against an in-memory MongoDB."""
+    try:
+        import mongomock
+    except ImportError:
+        sys.exit("The benchmarks need mongomock as the MongoDB stand-in: pip install mongomock")
+    import pymongo
+    pymongo.MongoClient = mongomock.MongoClient
+
+    os.environ.setdefault("UPLOAD_FOLDER", tempfile.mkdtemp(prefix="bench_uploads_"))
+    os.environ.setdefault("MODEL_POLL_SECONDS", "0")
+    os.chdir(PROJECT_ROOT)
+    sys.path.insert(0, os.path.join(PROJECT_ROOT, "webapp"))
+    import app
+    return app
+
+
+def build_stages(app, seed):
+    """stage name -> (make_input(batch_size), run(input)); each run processes one batch."""
+    rng = random.Random(seed)
+    corpus = [make_resume_text(rng) for _ in range(max(BATCH_SIZES))]
+    job_desc = make_job_description(rng)
+    pdf_cache = {}
+
+    def texts(n):
+        return [corpus[i % len(corpus)] for i in range(n)]
+
+    def pdfs(pages):
+        def make(n):
+            if (pages, n) not in pdf_cache:
+                pdf_cache[(pages, n)] = [(f"r{i}.pdf", make_pdf(text, pages)) for i, text in enumerate(texts(n))]
+            return pdf_cache[(pages, n)]
+        return make
+
+    served = app.live_model.current()
+    model = served.model if served else None
+
+    stages = {
+        "extract_text_txt": (
+            lambda n: [(f"r{i}.txt", t.encode("utf-8")) for i, t in enumerate(texts(n))],
+            lambda uploads: [app.extract_text(u) for u in uploads],
+        ),
+        "extract_text_pdf_1p": (pdfs(1), lambda uploads: [app.extract_text(u) for u in uploads]),
+        "extract_text_pdf_5p": (pdfs(5), lambda uploads: [app.extract_text(u) for u in uploads]),
+        "rank_resumes": (texts, lambda resumes: app.rank_resumes(job_desc, resumes)),
+    }
+    stages["clean_text"] = (texts, lambda resumes: [clean_text(t) for t in resumes])
+    stages["clean_texts"] = (texts, clean_texts)
+    matcher = matcher_for(job_desc)
+    stages["skill_match"] = (texts, lambda resumes: [matcher.match(t) for t in resumes])
+    if model is not None:
+        stages["predict"] = (texts, model.predict)
+        if hasattr(model, "predict_proba"):
+            stages["predict_proba"] = (texts, model.predict_proba)
+        stages["score_resumes"] = (
+            texts,
+            lambda resumes: app.score_resumes(served, job_desc, resumes, [None] * len(resumes)),
+        )
+    else:
+        print("Skipping predict/predict_proba/score_resumes: no model available")
+    return stages
+
+
+def measure(make_input, run, batch_size, repeat):
+    data = make_input(batch_size)
+    run(data)  # warm-up (imports, lazy caches)
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run(data)
+        timings.append(time.perf_counter() - start)
+
+    # Separate traced run: tracemalloc slows allocation down too much to time under it
+    tracemalloc.start()
+    run(data)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    timings = np.array(timings)
+    p50 = float(np.percentile(timings, 50))
+    return {
+        "batch_size": batch_size,
+        "repeat": repeat,
+        "p50_ms": p50 * 1000,
+        "p95_ms": float(np.percentile(timings, 95)) * 1000,
+        "mean_ms": float(timings.mean()) * 1000,
+        "throughput_per_s": batch_size / p50 if p50 else None,
+        "peak_mem_kb": peak / 1024,
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the resume screening hot paths.")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=BATCH_SIZES)
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per stage and batch size")
+    parser.add_argument("--stages", nargs="+", help="only run these stages")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="JSON file to write (default: benchmarks/results/<timestamp>.json)")
+    args = parser.parse_args()
+
+    warnings.filterwarnings("ignore")
+    app = load_app()
+    stages = build_stages(app, args.seed)
+    selected = args.stages or list(stages)
+
+    results = []
+    for name in selected:
+        if name not in stages:
+            print(f"Unknown or unavailable stage: {name}")
+            continue
+        make_input, run = stages[name]
+        for batch_size in args.batch_sizes:
+            result = {"stage": name, **measure(make_input, run, batch_size, args.repeat)}
+            results.append(result)
+            print(f"{name:>22}  batch {batch_size:>5}  p50 {result['p50_ms']:10.2f} ms  "
+                  f"p95 {result['p95_ms']:10.2f} ms  {result['throughput_per_s']:10.1f}/s  "
+                  f"peak {result['peak_mem_kb']:10.1f} KB")
+
+    started = datetime.now(timezone.utc)
+    output = args.output or os.path.join(RESULTS_DIR, started.strftime("%Y%m%d-%H%M%S") + ".json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump({
+            "meta": {
+                "created_at": started.isoformat(),
+                "commit": git_commit(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "cpu_count": os.cpu_count(),
+                "seed": args.seed,
+            },
+            "results": results,
+        }, f, indent=2)
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
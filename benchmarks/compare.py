@@ -0,0 +1,34 @@
+# resume_screening/benchmarks/compare.py
+#
+# Compares two bench_hot_paths.py result files:
+#   python benchmarks/compare.py baseline.json candidate.json
+
+import sys
+import json
+
+
+def load_results(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return {(r["stage"], r["batch_size"]): r for r in json.load(f)["results"]}
+
+
+def main(baseline_path, candidate_path):
+    baseline = load_results(baseline_path)
+    candidate = load_results(candidate_path)
+
+    print(f"{'stage':>22}  {'batch':>5}  {'p50 before':>12}  {'p50 after':>12}  {'speedup':>8}  {'peak mem':>9}")
+    for key in sorted(baseline.keys() & candidate.keys()):
+        before, after = baseline[key], candidate[key]
+        speedup = before["p50_ms"] / after["p50_ms"] if after["p50_ms"] else float("inf")
+        memory = after["peak_mem_kb"] / before["peak_mem_kb"] if before["peak_mem_kb"] else float("inf")
+        print(f"{key[0]:>22}  {key[1]:>5}  {before['p50_ms']:>9.2f} ms  {after['p50_ms']:>9.2f} ms  "
+              f"{speedup:>7.2f}x  {memory:>8.2f}x")
+
+    for key in sorted(baseline.keys() ^ candidate.keys()):
+        print(f"{key[0]:>22}  {key[1]:>5}  only in {'baseline' if key in baseline else 'candidate'}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        sys.exit("usage: python benchmarks/compare.py baseline.json candidate.json")
+    main(sys.argv[1], sys.argv[2])
@@ -0,0 +1,480 @@
+# resume_screening/benchmarks/load_test.py
+#
+# End-to-end load / soak test of the webapp under the gunicorn settings of webapp/dockerfile:
+#   python benchmarks/load_test.py --rate 20 --duration 60 --mix predict=0.6,download=0.3,signin=0.1
+#   python benchmarks/load_test.py --rate 5 --duration 3600 --report-interval 60   # soak
+#
+# MongoDB: --mongo-uri, else a throwaway mongod if one is on PATH, else mongomock
+# (benchmarks/serve_standin.py). --url targets an already running server instead.
+# Requests are sent open-loop at the target rate; latency is measured from each
+# request's scheduled start, so a saturated server shows up as latency, not as a
+# lower send rate. Linux only (worker memory is read from /proc).
+
+import os
+import re
+import sys
+import json
+import time
+import uuid
+import random
+import shutil
+import signal
+import socket
+import argparse
+import tempfile
+import threading
+import subprocess
+import http.client
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from urllib.parse import urlencode, urlsplit
+
+import numpy as np
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+from benchmarks.synthetic import make_uploads, make_job_description
+from benchmarks.serve_standin import LOADTEST_EMAIL, LOADTEST_PASSWORD
+
+WEBAPP_DIR = os.path.join(PROJECT_ROOT, "webapp")
+RESULTS_DIR = os.path.join(PROJECT_ROOT, "benchmarks", "results")
+DEFAULT_MIX = "predict=0.6,download=0.3,signin=0.1"
+# Latency histogram bucket upper bounds in ms (the last bucket is everything slower)
+BUCKETS_MS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def gunicorn_args_from_dockerfile(bind):
+    """The CMD of webapp/dockerfile, bound locally and pointed at webapp/app.py."""
+    with open(os.path.join(WEBAPP_DIR, "dockerfile"), "r", encoding="utf-8") as f:
+        cmd = [line for line in f if line.startswith("CMD")][-1]
+    args = json.loads(cmd[len("CMD"):].strip())[1:]
+    args[args.index("-b") + 1] = bind
+    args[-1] = "app:app"
+    return args
+
+
+# --- SERVER UNDER TEST ---
+
+class Server:
+    """Starts mongod (if used) and gunicorn; stops both on close()."""
+
+    def __init__(self, mongo_uri=None, workers=None):
+        self.tmp_dir = tempfile.mkdtemp(prefix="loadtest_")
+        self.port = free_port()
+        self.url = f"http://127.0.0.1:{self.port}"
+        self.mongod = None
+        self.mongo_mode = "uri" if mongo_uri else None
+
+        env = dict(os.environ)
+        env["UPLOAD_FOLDER"] = os.path.join(self.tmp_dir, "uploads")
+        # gunicorn runs in webapp/; fall back to a model kept in the project root
+        if "MODEL_PATH" not in env:
+            for name in ("model.joblib", "model.pkl"):
+                if not os.path.exists(os.path.join(WEBAPP_DIR, name)) and os.path.exists(os.path.join(PROJECT_ROOT, name)):
+                    env["MODEL_PATH"] = os.path.join(PROJECT_ROOT, name)
+                    break
+        if not mongo_uri and shutil.which("mongod"):
+            mongo_uri = self._start_mongod()
+            self.mongo_mode = "mongod"
+
+        args = gunicorn_args_from_dockerfile(f"127.0.0.1:{self.port}")
+        if workers:
+            args[args.index("-w") + 1] = str(workers)
+        if mongo_uri:
+            env["MONGO_URI"] = mongo_uri
+            seed_user(mongo_uri)
+            command = [sys.executable, "-m", "gunicorn"] + args
+        else:
+            self.mongo_mode = "mongomock"
+            command = [sys.executable, os.path.join(PROJECT_ROOT, "benchmarks", "serve_standin.py")] + args
+
+        print(f"Starting: {' '.join(command)} (MongoDB: {self.mongo_mode})")
+        self.log = open(os.path.join(self.tmp_dir, "gunicorn.log"), "wb")
+        self.process = subprocess.Popen(command, cwd=WEBAPP_DIR, env=env, stdout=self.log, stderr=subprocess.STDOUT)
+        self._wait_ready()
+
+    def _start_mongod(self):
+        port = free_port()
+        db_path = os.path.join(self.tmp_dir, "mongo")
+        os.makedirs(db_path)
+        self.mongod = subprocess.Popen(
+            ["mongod", "--dbpath", db_path, "--port", str(port), "--bind_ip", "127.0.0.1", "--quiet"],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        return f"mongodb://127.0.0.1:{port}/resume_screening_loadtest"
+
+    def _wait_ready(self, timeout=120):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"gunicorn exited with {self.process.returncode}; see {self.log.name}")
+            try:
+                conn = http.client.HTTPConnection("127.0.0.1", self.port, timeout=2)
+                conn.request("GET", "/")
+                if conn.getresponse().status == 200:
+                    return
+            except OSError:
+                pass
+            time.sleep(0.5)
+        raise RuntimeError(f"gunicorn did not become ready in {timeout}s; see {self.log.name}")
+
+    def close(self):
+        for process in (self.process, self.mongod):
+            if process and process.poll() is None:
+                process.send_signal(signal.SIGTERM)
+                try:
+                    process.wait(timeout=30)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+        self.log.close()
+        print(f"Server log: {self.log.name}")
+
+
+def seed_user(mongo_uri):
+    from pymongo import MongoClient
+    from werkzeug.security import generate_password_hash
+
+    client = MongoClient(mongo_uri, serverSelectionTimeoutMS=30000)
+    db = client.get_database()
+    db["users"].update_one(
+        {"email": LOADTEST_EMAIL},
+        {"$set": {"name": "Load Test", "password": generate_password_hash(LOADTEST_PASSWORD)}},
+        upsert=True,
+    )
+    client.close()
+
+
+# --- MEMORY SAMPLING ---
+
+def rss_kb(pid):
+    try:
+        with open(f"/proc/{pid}/status", "r") as f:
+            match = re.search(r"^VmRSS:\s+(\d+)", f.read(), re.MULTILINE)
+        return int(match.group(1)) if match else None
+    except OSError:
+        return None
+
+
+def child_pids(pid):
+    children = []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", "r") as f:
+                # The ppid is the 2nd field after the parenthesised command name
+                if int(f.read().rsplit(")", 1)[1].split()[1]) == pid:
+                    children.append(int(entry))
+        except (OSError, IndexError, ValueError):
+            continue
+    return children
+
+
+class MemorySampler(threading.Thread):
+    """Records the RSS of the gunicorn master and each worker every `interval` seconds."""
+
+    def __init__(self, master_pid, interval):
+        super().__init__(name="rss-sampler", daemon=True)
+        self.master_pid = master_pid
+        self.interval = interval
+        self.samples = []  # (elapsed s, {pid: rss_kb})
+        self._stopped = threading.Event()
+        self._start = time.monotonic()
+
+    def sample(self):
+        pids = [self.master_pid] + child_pids(self.master_pid)
+        self.samples.append((time.monotonic() - self._start, {pid: rss_kb(pid) for pid in pids}))
+
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            self.sample()
+
+    def stop(self):
+        self._stopped.set()
+        self.sample()
+
+    def summary(self):
+        per_pid = defaultdict(list)
+        for elapsed, sample in self.samples:
+            for pid, rss in sample.items():
+                if rss is not None:
+                    per_pid[pid].append((elapsed, rss))
+        processes = {}
+        for pid, points in per_pid.items():
+            values = [rss for _, rss in points]
+            processes[str(pid)] = {
+                "role": "master" if pid == self.master_pid else "worker",
+                "first_kb": values[0],
+                "last_kb": values[-1],
+                "max_kb": max(values),
+                "growth_kb": values[-1] - values[0],
+                "seen_from_s": round(points[0][0], 1),
+                "seen_until_s": round(points[-1][0], 1),
+            }
+        workers = [p for p in processes.values() if p["role"] == "worker"]
+        return {
+            "processes": processes,
+            # More workers than -w over the run means some were killed (timeouts) and respawned
+            "workers_seen": len(workers),
+            "timeline": [
+                {"elapsed_s": round(elapsed, 1), "total_rss_kb": sum(v for v in sample.values() if v)}
+                for elapsed, sample in self.samples
+            ],
+        }
+
+
+# --- TRAFFIC ---
+
+def encode_multipart(fields, files):
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, value in fields.items():
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode("utf-8")
+        )
+    for name, filename, data in files:
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+            f'Content-Type: application/octet-stream\r\n\r\n'.encode("utf-8") + data + b"\r\n"
+        )
+    parts.append(f"--{boundary}--\r\n".encode("utf-8"))
+    return b"".join(parts), f"multipart/form-data; boundary={boundary}"
+
+
+class Traffic:
+    """Builds requests for each endpoint of the mix."""
+
+    def __init__(self, files_per_predict, pdf_share, seed):
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.files_per_predict = files_per_predict
+        # A fixed pool of uploads: repeats exercise the content-hash dedupe like real re-uploads do
+        self.uploads = make_uploads(max(files_per_predict * 20, 50), seed=seed, pdf_share=pdf_share)
+        self.job_descriptions = [make_job_description(self.rng) for _ in range(20)]
+        self.download_paths = []
+
+    def build(self, endpoint):
+        with self.lock:
+            if endpoint == "predict":
+                files = self.rng.sample(self.uploads, self.files_per_predict)
+                body, content_type = encode_multipart(
+                    {"job_description": self.rng.choice(self.job_descriptions)},
+                    [("resumes", name, data) for name, data in files],
+                )
+                return "POST", "/predict", body, {"Content-Type": content_type}
+            if endpoint == "download":
+                if not self.download_paths:
+                    return None
+                return "GET", self.rng.choice(self.download_paths), None, {}
+            if endpoint == "signin":
+                body = urlencode({"email": LOADTEST_EMAIL, "password": LOADTEST_PASSWORD}).encode("utf-8")
+                return "POST", "/signin", body, {"Content-Type": "application/x-www-form-urlencoded"}
+        raise ValueError(f"Unknown endpoint: {endpoint}")
+
+    def observe(self, endpoint, status, body):
+        # Stored files of successful predictions become download targets
+        if endpoint != "predict" or status != 200:
+            return
+        try:
+            urls = [r["download_url"] for r in json.loads(body).get("results", [])]
+        except (ValueError, KeyError):
+            return
+        with self.lock:
+            self.download_paths.extend(u for u in urls if u not in self.download_paths)
+
+
+class Stats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)   # endpoint -> [ms] of completed requests
+        self.outcomes = defaultdict(lambda: defaultdict(int))  # endpoint -> outcome -> count
+
+    def record(self, endpoint, outcome, latency_ms=None):
+        with self.lock:
+            self.outcomes[endpoint][outcome] += 1
+            if latency_ms is not None:
+                self.latencies[endpoint].append(latency_ms)
+
+    def snapshot(self):
+        with self.lock:
+            return {e: dict(o) for e, o in self.outcomes.items()}
+
+    def summary(self, duration):
+        report = {}
+        for endpoint, outcomes in self.outcomes.items():
+            total = sum(outcomes.values())
+            latencies = np.array(self.latencies.get(endpoint, []))
+            errors = total - outcomes.get("ok", 0)
+            counts, _ = np.histogram(latencies, bins=[0] + BUCKETS_MS + [np.inf]) if len(latencies) else ([], None)
+            report[endpoint] = {
+                "requests": total,
+                "throughput_per_s": total / duration if duration else None,
+                "outcomes": dict(outcomes),
+                "error_rate": errors / total if total else 0.0,
+                "timeout_rate": outcomes.get("timeout", 0) / total if total else 0.0,
+                "p50_ms": float(np.percentile(latencies, 50)) if len(latencies) else None,
+                "p95_ms": float(np.percentile(latencies, 95)) if len(latencies) else None,
+                "p99_ms": float(np.percentile(latencies, 99)) if len(latencies) else None,
+                "max_ms": float(latencies.max()) if len(latencies) else None,
+                "histogram_ms": {
+                    (f"<={bound}" if bound != np.inf else f">{BUCKETS_MS[-1]}"): int(count)
+                    for bound, count in zip(BUCKETS_MS + [np.inf], counts)
+                },
+            }
+        return report
+
+
+def send(base_url, endpoint, request, scheduled, timeout, traffic, stats):
+    method, path, body, headers = request
+    parts = urlsplit(base_url)
+    conn = http.client.HTTPConnection(parts.hostname, parts.port, timeout=timeout)
+    try:
+        conn.request(method, path, body=body, headers=headers)
+        response = conn.getresponse()
+        data = response.read()
+        latency_ms = (time.monotonic() - scheduled) * 1000
+        # /signin answers a good login with a redirect to /resume
+        ok = response.status < 400 and not (endpoint == "signin" and response.status == 200)
+        stats.record(endpoint, "ok" if ok else f"http_{response.status}", latency_ms)
+        traffic.observe(endpoint, response.status, data)
+    except socket.timeout:
+        stats.record(endpoint, "timeout")
+    except (OSError, http.client.HTTPException):
+        # Connection reset: typically a worker killed by gunicorn's -t timeout
+        stats.record(endpoint, "connection_error")
+    finally:
+        conn.close()
+
+
+def parse_mix(mix):
+    weights = {}
+    for item in mix.split(","):
+        name, weight = item.split("=")
+        weights[name.strip()] = float(weight)
+    return weights
+
+
+def run_load(base_url, args, traffic, stats, sampler=None):
+    mix = parse_mix(args.mix)
+    endpoints, weights = list(mix), list(mix.values())
+    rng = random.Random(args.seed)
+    pool = ThreadPoolExecutor(max_workers=args.concurrency, thread_name_prefix="load")
+    in_flight = threading.BoundedSemaphore(args.concurrency)
+
+    # A few predictions first, so there are stored files to download
+    if "download" in mix:
+        for _ in range(3):
+            send(base_url, "predict", traffic.build("predict"), time.monotonic(), args.timeout, traffic, Stats())
+
+    start = time.monotonic()
+    next_at = start
+    next_report = start + args.report_interval if args.report_interval else None
+    while next_at < start + args.duration:
+        now = time.monotonic()
+        if next_at > now:
+            time.sleep(next_at - now)
+        endpoint = rng.choices(endpoints, weights)[0]
+        request = traffic.build(endpoint)
+        if request is None:
+            stats.record(endpoint, "skipped")
+        elif not in_flight.acquire(blocking=False):
+            # More than --concurrency requests outstanding: the client, not the server, is the limit
+            stats.record(endpoint, "client_saturated")
+        else:
+            scheduled = next_at
+
+            def task(endpoint=endpoint, request=request, scheduled=scheduled):
+                try:
+                    send(base_url, endpoint, request, scheduled, args.timeout, traffic, stats)
+                finally:
+                    in_flight.release()
+            pool.submit(task)
+        # Poisson arrivals: exponential gaps with mean 1/rate
+        next_at += rng.expovariate(args.rate)
+
+        if next_report and time.monotonic() >= next_report:
+            next_report += args.report_interval
+            rss = ""
+            if sampler and sampler.samples:
+                rss = f"  total RSS {sum(v for v in sampler.samples[-1][1].values() if v) / 1024:.0f} MB"
+            print(f"[{time.monotonic() - start:7.0f}s] {stats.snapshot()}{rss}")
+
+    pool.shutdown(wait=True)
+    return time.monotonic() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load / soak test the resume screening webapp.")
+    parser.add_argument("--url", help="test an already running server instead of starting gunicorn")
+    parser.add_argument("--mongo-uri", help="MongoDB for the started server (default: mongod on PATH, else mongomock)")
+    parser.add_argument("--workers", type=int, help="override gunicorn -w from the dockerfile")
+    parser.add_argument("--rate", type=float, default=10.0, help="target requests per second")
+    parser.add_argument("--duration", type=float, default=60.0, help="seconds of load")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="endpoint weights, e.g. " + DEFAULT_MIX)
+    parser.add_argument("--concurrency", type=int, default=64, help="max requests in flight")
+    parser.add_argument("--timeout", type=float, default=30.0, help="client timeout per request (s)")
+    parser.add_argument("--files-per-predict", type=int, default=5)
+    parser.add_argument("--pdf-share", type=float, default=0.5)
+    parser.add_argument("--sample-interval", type=float, default=5.0, help="seconds between RSS samples")
+    parser.add_argument("--report-interval", type=float, default=0, help="print progress every N seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="JSON file to write (default: benchmarks/results/load-<timestamp>.json)")
+    args = parser.parse_args()
+
+    traffic = Traffic(args.files_per_predict, args.pdf_share, args.seed)
+    stats = Stats()
+    server = None if args.url else Server(args.mongo_uri, args.workers)
+    base_url = args.url or server.url
+    sampler = None
+    try:
+        if server:
+            sampler = MemorySampler(server.process.pid, args.sample_interval)
+            sampler.sample()
+            sampler.start()
+        duration = run_load(base_url, args, traffic, stats, sampler)
+    finally:
+        if sampler:
+            sampler.stop()
+        if server:
+            server.close()
+
+    report = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "url": base_url,
+            "mongo": server.mongo_mode if server else None,
+            "gunicorn_args": gunicorn_args_from_dockerfile("127.0.0.1:<port>") if server else None,
+            **{k: v for k, v in vars(args).items() if k not in ("output",)},
+        },
+        "duration_s": duration,
+        "endpoints": stats.summary(duration),
+        "memory": sampler.summary() if sampler else None,
+    }
+
+    for endpoint, result in report["endpoints"].items():
+        print(f"{endpoint:>9}: {result['requests']} requests, error rate {result['error_rate']:.1%}, "
+              f"timeouts {result['timeout_rate']:.1%}, p50 {result['p50_ms'] or 0:.0f} ms, "
+              f"p95 {result['p95_ms'] or 0:.0f} ms, p99 {result['p99_ms'] or 0:.0f} ms  {result['outcomes']}")
+    if sampler:
+        for pid, proc in report["memory"]["processes"].items():
+            print(f"{proc['role']:>7} {pid}: RSS {proc['first_kb'] / 1024:.0f} -> {proc['last_kb'] / 1024:.0f} MB "
+                  f"(max {proc['max_kb'] / 1024:.0f} MB)")
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, "load-" + datetime.now(timezone.utc).strftime("%Y%m%d-%H%M%S") + ".json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
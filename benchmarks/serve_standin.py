@@ -0,0 +1,42 @@
+# resume_screening/benchmarks/serve_standin.py
+#
+# Runs gunicorn with MongoDB replaced by mongomock, for load tests on a box without
+# mongod (run from webapp/, arguments are passed to gunicorn unchanged):
+#   python ../benchmarks/serve_standin.py -c gunicorn.conf.py -w 4 -t 2 -b 127.0.0.1:5000 app:app
+#
+# The in-memory store is created and seeded in the master, so every forked worker
+# starts with the load-test user; writes made by one worker are not seen by the others.
+
+import os
+import sys
+import functools
+
+from werkzeug.security import generate_password_hash
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+LOADTEST_EMAIL = os.environ.get("LOADTEST_EMAIL", "loadtest@example.com")
+LOADTEST_PASSWORD = os.environ.get("LOADTEST_PASSWORD", "loadtest-password")
+
+
+def install_standin():
+    import mongomock
+    import pymongo
+
+    store = mongomock.store.ServerStore()
+    pymongo.MongoClient = functools.partial(mongomock.MongoClient, _store=store)
+
+    from utils.db import get_collection
+    get_collection("users").update_one(
+        {"email": LOADTEST_EMAIL},
+        {"$set": {"name": "Load Test", "password": generate_password_hash(LOADTEST_PASSWORD)}},
+        upsert=True,
+    )
+
+
+if __name__ == "__main__":
+    install_standin()
+    from gunicorn.app.wsgiapp import run
+    sys.argv = ["gunicorn"] + sys.argv[1:]
+    sys.exit(run())
@@ -0,0 +1,67 @@
+import random
+import fitz  # PyMuPDF
+
+# Synthetic resumes and job descriptions for the benchmark and load-test scripts.
+# Deterministic for a given seed, so runs on different commits see the same input.
+
+SKILLS = {
+    "Data Science": "python pandas numpy scikit-learn statistics regression tensorflow machine learning sql tableau",
+    "Java Developer": "java spring boot hibernate maven microservices rest jpa junit kafka",
+    "Python Developer": "python django flask fastapi celery postgresql rest docker pytest redis",
+    "Web Designing": "html css javascript photoshop figma bootstrap responsive ux wireframes jquery",
+    "DevOps Engineer": "docker kubernetes jenkins terraform ansible aws linux ci cd monitoring",
+    "HR": "recruitment onboarding payroll employee relations hiring interviews policies training compliance",
+    "Testing": "selenium test cases regression manual testing jira qa automation defects cucumber",
+    "Sales": "sales targets crm negotiation clients lead generation revenue accounts pipeline forecasting",
+    "Network Security Engineer": "firewall vpn ids siem penetration testing network security cisco routing",
+    "Civil Engineer": "autocad site supervision construction structural design surveying estimation concrete",
+}
+
+FILLER = (
+    "experienced professional team responsible delivered projects worked company years "
+    "managed developed improved collaborated stakeholders requirements reports quality"
+).split()
+
+
+def make_resume_text(rng, category=None, words=300):
+    """One plain-text resume of roughly `words` words, weighted towards a category's skills."""
+    category = category or rng.choice(sorted(SKILLS))
+    skills = SKILLS[category].split()
+    body = [rng.choice(skills) if rng.random() < 0.4 else rng.choice(FILLER) for _ in range(words)]
+    lines = [" ".join(body[i:i + 12]) for i in range(0, len(body), 12)]
+    return f"{category} resume\nSkills: {', '.join(rng.sample(skills, 5))}\n" + "\n".join(lines)
+
+
+def make_job_description(rng, category=None, words=80):
+    category = category or rng.choice(sorted(SKILLS))
+    skills = SKILLS[category].split()
+    body = [rng.choice(skills) if rng.random() < 0.6 else rng.choice(FILLER) for _ in range(words)]
+    return f"We are hiring a {category}. " + " ".join(body)
+
+
+def make_pdf(text, pages=1):
+    """PDF bytes with the text spread over `pages` pages."""
+    lines = text.splitlines() or [""]
+    per_page = max(len(lines) // pages, 1)
+    doc = fitz.open()
+    for i in range(pages):
+        page = doc.new_page()
+        chunk = lines[i * per_page:(i + 1) * per_page] or lines[-1:]
+        page.insert_textbox(fitz.Rect(50, 50, 550, 800), "\n".join(chunk), fontsize=9)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def make_uploads(count, seed=0, pdf_share=0.5, pages=(1, 2, 5), words=300):
+    """`count` (filename, bytes) uploads, a mix of TXT and PDF files of varying page counts."""
+    rng = random.Random(seed)
+    uploads = []
+    for i in range(count):
+        text = make_resume_text(rng, words=words)
+        if rng.random() < pdf_share:
+            page_count = rng.choice(pages)
+            uploads.append((f"resume_{i}.pdf", make_pdf(text, page_count)))
+        else:
+            uploads.append((f"resume_{i}.txt", text.encode("utf-8")))
+    return uploads
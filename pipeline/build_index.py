@@ -0,0 +1,73 @@
+# resume_screening/pipeline/build_index.py
+
+import os
+import sys
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.db import get_collection
+from utils.tfidf_index import TfidfIndex
+from utils.lsa_index import LsaIndex, LSA_COMPONENTS
+from utils.scoring import split_model
+from utils.model_store import default_model_path
+from utils.model_registry import load_serving_model
+
+DEFAULT_INDEX_DIR = os.path.join("indexes", "tfidf")
+DEFAULT_LSA_DIR = os.path.join("indexes", "lsa")
+
+def load_stored_resumes_from_db():
+    collection = get_collection("uploads")
+
+    texts, ids = [], []
+    cursor = collection.find(
+        {"content_hash": {"$exists": True}, "text": {"$ne": ""}},
+        {"_id": 0, "content_hash": 1, "text": 1}
+    )
+    for doc in cursor:
+        texts.append(doc["text"])
+        ids.append(doc["content_hash"])
+
+    if not texts:
+        raise ValueError("No stored resumes with a content hash found in the database.")
+
+    return texts, ids
+
+def load_model_featurizer(model_path, registry=None):
+    """Returns (featurizer, model_id, version) of the serving model, or Nones if unavailable."""
+    served = load_serving_model(model_path, registry)
+    if served is None:
+        return None, None, None
+    featurizer, _ = split_model(served.model)
+    if featurizer is None:
+        return None, None, None
+    return featurizer, served.model_id, served.version
+
+def build_index(index_dir=DEFAULT_INDEX_DIR, model_path=None, lsa_dir=None, lsa_components=LSA_COMPONENTS):
+    """Builds the TF-IDF index and, with lsa_dir, the dense LSA index over the same resumes."""
+    model_path = model_path or default_model_path()
+    try:
+        texts, ids = load_stored_resumes_from_db()
+        # Index in the model's own feature space so /predict can reuse the rows for
+        # classification as well as similarity; fit a standalone TF-IDF otherwise.
+        # Rebuild after publishing a new model version to keep that reuse.
+        featurizer, model_id, version = load_model_featurizer(model_path)
+        index = TfidfIndex.build(texts, ids, vectorizer=featurizer, model_id=model_id)
+        index.save(index_dir)
+        source = f"model {version}" if model_id else "a corpus-fitted TF-IDF"
+        print(f"Indexed {len(index)} resumes with {source} into {index_dir}")
+        if lsa_dir:
+            lsa = LsaIndex.build(texts, ids, n_components=lsa_components)
+            lsa.save(lsa_dir)
+            print(f"Projected {len(lsa)} resumes onto {lsa.n_components} LSA components "
+                  f"({lsa.explained_variance:.1%} of the TF-IDF variance) into {lsa_dir}")
+    except Exception as e:
+        print(f"Error: {e}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the corpus indexes used by /predict and /search.")
+    parser.add_argument("index_dir", nargs="?", default=DEFAULT_INDEX_DIR)
+    parser.add_argument("--lsa", action="store_true", help="also build the dense LSA index")
+    parser.add_argument("--lsa-dir", default=DEFAULT_LSA_DIR)
+    parser.add_argument("--lsa-components", type=int, default=LSA_COMPONENTS)
+    args = parser.parse_args()
+    build_index(args.index_dir, lsa_dir=args.lsa_dir if args.lsa else None, lsa_components=args.lsa_components)
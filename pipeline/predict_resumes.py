@@ -1,9 +1,9 @@
 import os
+import sys
 import pickle
 import tempfile
 from flask import Flask, request, render_template, jsonify, redirect, url_for, session, send_from_directory
 from werkzeug.utils import secure_filename
-from pymongo import MongoClient
 from datetime import datetime
 import fitz  # PyMuPDF
 from sklearn.metrics.pairwise import cosine_similarity
@@ -11,6 +11,9 @@ from sklearn.feature_extraction.text import TfidfVectorizer
 from flask_mail import Mail, Message
 from werkzeug.security import generate_password_hash, check_password_hash
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.db import get_db
+
 # Flask setup
 app = Flask(__name__)
 app.secret_key = 'your_secret_key'  # Set a strong secret key
@@ -35,8 +38,7 @@ ADMIN_EMAIL = 'admin@example.com'
 ADMIN_PASSWORD = generate_password_hash('adminpassword')
 
 # MongoDB setup
-client = MongoClient("mongodb://localhost:27017/")
-db = client["resume_screening"]
+db = get_db()
 uploads_col = db["uploads"]
 users_collection = db["users"]
 contact_collection = db["contacts"]
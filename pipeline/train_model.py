@@ -1,61 +1,205 @@
 # resume_screening/pipeline/train_model.py
 
-import pickle
 import os
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.linear_model import LogisticRegression
+import sys
+import zlib
+from collections import Counter
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.linear_model import LogisticRegression, SGDClassifier
 from sklearn.pipeline import make_pipeline
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import classification_report
-from pymongo import MongoClient
+from sklearn.metrics import classification_report, accuracy_score
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.db import get_collection
+from utils.model_store import save_model
+from utils.model_registry import ModelRegistry, REGISTRY_DIR
+from utils.feature_cache import FeatureCache, vectorize_split, tune_classifier
+
+# Only the fields a labeled example is built from
+LABELED_PROJECTION = {"_id": 0, "resume": 1, "text": 1, "category": 1, "predicted_category": 1}
+
+# Streaming mode: documents per cursor batch / partial_fit call, hashed feature space size
+STREAM_BATCH_SIZE = 1000
+STREAM_N_FEATURES = 2 ** 18
+
+def labeled_example(doc):
+    """Returns (text, label) of a predictions document, or None if either is missing."""
+    text = (doc.get("resume", "") or doc.get("text", "")).strip()
+    label = (doc.get("category", "") or doc.get("predicted_category", "")).strip()
+    if text and label:
+        return text, label
+    return None
 
 def load_labeled_resumes_from_db():
-    client = MongoClient("mongodb://localhost:27017/")
-    try:
-        db = client["resume_screening"]
-        collection = db["predictions"]
+    collection = get_collection("predictions")
+
+    texts, labels = [], []
+
+    # A fixed order keeps the corpus fingerprint (and so the feature cache key) stable
+    for doc in collection.find({}, LABELED_PROJECTION).sort("_id", 1):
+        example = labeled_example(doc)
+        if example:
+            texts.append(example[0])
+            labels.append(example[1])
+
+    if not texts:
+        raise ValueError("No valid labeled resume data found in the database.")
+
+    return texts, labels
+
+def iter_labeled_batches(collection, batch_size=STREAM_BATCH_SIZE):
+    """Yields (texts, labels) lists of at most batch_size examples straight from the cursor."""
+    texts, labels = [], []
+    for doc in collection.find({}, LABELED_PROJECTION).batch_size(batch_size):
+        example = labeled_example(doc)
+        if not example:
+            continue
+        texts.append(example[0])
+        labels.append(example[1])
+        if len(texts) == batch_size:
+            yield texts, labels
+            texts, labels = [], []
+    if texts:
+        yield texts, labels
+
+def is_holdout(text, test_size):
+    """Stable train/test split by content hash: the same resume always lands on the same side."""
+    return zlib.crc32(text.encode("utf-8")) % 1000 < test_size * 1000
 
-        texts, labels = [], []
+def collect_labels(collection, batch_size=STREAM_BATCH_SIZE):
+    """Every label in the corpus; partial_fit needs the full class list up front."""
+    labels = set()
+    for texts, batch_labels in iter_labeled_batches(collection, batch_size):
+        labels.update(batch_labels)
+    return sorted(labels)
 
-        for doc in collection.find():
-            text = doc.get("resume", "") or doc.get("text", "")
-            label = doc.get("category", "") or doc.get("predicted_category", "")
+def report_from_confusion(confusion, labels):
+    """Returns (accuracy, classification_report-style dict) from (true, predicted) -> count."""
+    report = {}
+    total = sum(confusion.values())
+    correct = sum(n for (true, pred), n in confusion.items() if true == pred)
+    for label in labels:
+        tp = confusion.get((label, label), 0)
+        support = sum(n for (true, _), n in confusion.items() if true == label)
+        predicted = sum(n for (_, pred), n in confusion.items() if pred == label)
+        precision = tp / predicted if predicted else 0.0
+        recall = tp / support if support else 0.0
+        f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+        report[label] = {"precision": precision, "recall": recall, "f1-score": f1, "support": support}
+    return (correct / total if total else 0.0), report
 
-            if text.strip() and label.strip():
-                texts.append(text.strip())
-                labels.append(label.strip())
+def train_model_streaming(registry_dir=REGISTRY_DIR, model_path=None, batch_size=STREAM_BATCH_SIZE,
+                          n_features=STREAM_N_FEATURES, test_size=0.3, epochs=1):
+    """Out-of-core training: memory stays bounded by batch_size, not by the corpus.
 
-        if not texts:
+    Resumes are read from the cursor in batches, vectorized with a stateless
+    HashingVectorizer (no vocabulary to hold) and fed to an SGDClassifier
+    through partial_fit. The holdout set is chosen by content hash and
+    evaluated in a second streaming pass that only keeps confusion counts.
+    """
+    try:
+        collection = get_collection("predictions")
+        labels = collect_labels(collection, batch_size)
+        if not labels:
             raise ValueError("No valid labeled resume data found in the database.")
 
-        return texts, labels
-    finally:
-        client.close()
+        vectorizer = HashingVectorizer(stop_words='english', n_features=n_features, alternate_sign=False)
+        # log_loss keeps predict_proba, which the webapp reports as confidence
+        classifier = SGDClassifier(loss='log_loss', random_state=42)
+
+        training_size = 0
+        for epoch in range(epochs):
+            for texts, batch_labels in iter_labeled_batches(collection, batch_size):
+                train = [(t, l) for t, l in zip(texts, batch_labels) if not is_holdout(t, test_size)]
+                if not train:
+                    continue
+                X = vectorizer.transform([t for t, _ in train])
+                classifier.partial_fit(X, [l for _, l in train], classes=labels)
+                if epoch == 0:
+                    training_size += len(train)
+            print(f"Epoch {epoch + 1}/{epochs}: trained on {training_size} resumes")
+
+        if not training_size:
+            raise ValueError("Every labeled resume fell into the holdout set.")
+
+        confusion = Counter()
+        for texts, batch_labels in iter_labeled_batches(collection, batch_size):
+            test = [(t, l) for t, l in zip(texts, batch_labels) if is_holdout(t, test_size)]
+            if test:
+                y_pred = classifier.predict(vectorizer.transform([t for t, _ in test]))
+                confusion.update(zip([l for _, l in test], y_pred))
+
+        accuracy, report = report_from_confusion(confusion, labels)
+        print("=== Holdout Evaluation ===")
+        print(f"accuracy: {accuracy:.4f} on {sum(confusion.values())} resumes")
+        for label, scores in report.items():
+            print(f"{label:>30}  precision {scores['precision']:.2f}  recall {scores['recall']:.2f}  "
+                  f"f1 {scores['f1-score']:.2f}  support {scores['support']}")
+
+        # Same Pipeline shape as the in-memory model, so the webapp serves it unchanged
+        model = make_pipeline(vectorizer, classifier)
+        version = ModelRegistry(registry_dir).publish(model, {
+            "labels": labels,
+            "training_size": training_size,
+            "test_size": sum(confusion.values()),
+            "training_mode": "streaming",
+            "n_features": n_features,
+            "epochs": epochs,
+            "metrics": {"accuracy": accuracy, "report": report},
+        })
+        print(f"Published model version {version} to {registry_dir}")
 
-def train_model(model_path="model.pkl"):
+        if model_path:
+            save_model(model, model_path)
+            print(f"Model saved to {model_path}")
+    except Exception as e:
+        print(f"Error: {e}")
+
+def train_model(registry_dir=REGISTRY_DIR, model_path=None, search=False, n_jobs=-1, cache=None):
+    """Trains a model and publishes it as the registry's latest version (also saved to model_path if given).
+
+    The vectorized split is cached by corpus fingerprint, so retraining an
+    unchanged corpus skips tokenization. With search=True the classifier's
+    hyperparameters are picked by a cross-validated grid search on n_jobs cores.
+    """
     try:
         texts, labels = load_labeled_resumes_from_db()
-        X_train, X_test, y_train, y_test = train_test_split(
-            texts, labels, test_size=0.3, random_state=42
-        )
+        vectorizer, X_train, X_test, y_train, y_test = vectorize_split(texts, labels, cache or FeatureCache())
 
-        model = make_pipeline(
-            TfidfVectorizer(stop_words='english'),
-            LogisticRegression(max_iter=1000)
-        )
-        model.fit(X_train, y_train)
+        params = {}
+        if search:
+            classifier, params = tune_classifier(X_train, y_train, n_jobs=n_jobs)
+        else:
+            classifier = LogisticRegression(max_iter=1000).fit(X_train, y_train)
+        model = make_pipeline(vectorizer, classifier)
 
-        y_pred = model.predict(X_test)
+        y_pred = classifier.predict(X_test)
         print("=== Classification Report ===")
         print(classification_report(y_test, y_pred))
 
-        # Ensure directory exists
-        os.makedirs(os.path.dirname(model_path) or ".", exist_ok=True)
-        with open(model_path, 'wb') as f:
-            pickle.dump(model, f)
-        print(f"Model saved to {model_path}")
+        # The webapp picks up the new version on its next poll of the registry
+        version = ModelRegistry(registry_dir).publish(model, {
+            "labels": sorted(set(labels)),
+            "training_size": X_train.shape[0],
+            "test_size": X_test.shape[0],
+            "params": params,
+            "metrics": {
+                "accuracy": accuracy_score(y_test, y_pred),
+                "report": classification_report(y_test, y_pred, output_dict=True, zero_division=0),
+            },
+        })
+        print(f"Published model version {version} to {registry_dir}")
+
+        if model_path:
+            save_model(model, model_path)
+            print(f"Model saved to {model_path}")
     except Exception as e:
         print(f"Error: {e}")
 
 if __name__ == "__main__":
-    train_model()
+    # --streaming trains out-of-core, for labeled corpora that do not fit in memory;
+    # --search tunes the classifier with a parallel grid search on the cached features
+    if "--streaming" in sys.argv[1:]:
+        train_model_streaming()
+    else:
+        train_model(search="--search" in sys.argv[1:])
@@ -0,0 +1,50 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.text_normalizer import normalize, normalize_many
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Senior Python Developer with the AWS skills", "senior python developer aws skills"),
+    ("Python 3, Django2 and 2020", "python"),
+    ("python, java", "python java"),
+    ("python,java", "python java"),
+    # word_tokenize leaves the second character of a ":"/"," pair glued to the next word
+    ("python,,java", "python"),
+    ("skills:,python", "skills"),
+    ("python,:java", "python"),
+    ("rust,,,java", "rust java"),
+    ("rust,,,,java", "rust"),
+    ("python,, java", "python java"),
+    ("version 1,,2", "version"),
+    # clitics are split off the word
+    ("the team's lead isn't here", "team lead"),
+    ("javan't' python", "java python"),
+    ("cannot gonna", "gon na"),
+    # a period ends a sentence unless it follows an abbreviation
+    ("worked at acme. then left", "worked acme left"),
+    ("dr. smith", "smith"),
+])
+def test_normalize(text, expected):
+    assert normalize(text) == expected
+
+
+def test_known_difference_closing_quote_without_space():
+    # word_tokenize drops "team's'" at the end of a text, it is kept here
+    assert normalize("team's'") == "team"
+    assert normalize("team's' lead") == "team lead"
+
+
+def test_normalize_non_text():
+    assert normalize(None) == ""
+    assert normalize("") == ""
+
+
+def test_normalize_many_matches_normalize():
+    texts = ["python,,java", "skills:,python", "team's lead.", "", None, "rust,,,java"]
+    assert normalize_many(texts) == [normalize(t) for t in texts]
+    assert normalize_many(["a\0b python"]) == [normalize("a\0b python")]
@@ -0,0 +1,81 @@
+import io
+import os
+import sys
+import tempfile
+from urllib.parse import quote
+
+import pytest
+
+from flask import send_file
+from werkzeug.http import parse_options_header
+
+mongomock = pytest.importorskip("mongomock")
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope="module")
+def client():
+    # The webapp reads its configuration at import time; MongoDB is replaced by mongomock
+    # the same way benchmarks/serve_standin.py does it
+    import pymongo
+    pymongo.MongoClient = mongomock.MongoClient
+    scratch = tempfile.mkdtemp()
+    os.environ.update({
+        "UPLOAD_FOLDER": os.path.join(scratch, "uploads"),
+        "MODEL_REGISTRY_DIR": os.path.join(scratch, "models"),
+        "MODEL_PATH": os.path.join(PROJECT_ROOT, "model.pkl"),
+        "TFIDF_INDEX_DIR": os.path.join(scratch, "tfidf"),
+        "LSA_INDEX_DIR": os.path.join(scratch, "lsa"),
+        "EXTRACT_WORKERS": "0",
+    })
+    sys.path.insert(0, os.path.join(PROJECT_ROOT, "webapp"))
+    import app as webapp
+
+    client = webapp.app.test_client()
+    with client.session_transaction() as session:
+        session["user"] = "admin@example.com"
+    return client
+
+
+def resumes():
+    return [
+        (io.BytesIO("Python developer, Django and SQL".encode("utf-8")), "简历.txt"),
+        (io.BytesIO(b"Java developer, Spring Boot"), "resume.txt"),
+    ]
+
+
+def test_predict_accepts_non_ascii_filenames(client):
+    response = client.post(
+        "/predict",
+        data={"job_description": "Python developer", "resumes": resumes()},
+        content_type="multipart/form-data",
+    )
+    assert response.status_code == 200
+    assert "resume.txt" in [result["name"] for result in response.get_json()["results"]]
+
+
+def test_jobs_accept_non_ascii_filenames(client):
+    response = client.post(
+        "/jobs",
+        data={"job_description": "Python developer", "resumes": resumes()},
+        content_type="multipart/form-data",
+    )
+    assert response.status_code == 202
+
+
+@pytest.mark.parametrize("filename", ["简历.txt", 'cv "final".txt'])
+def test_offloaded_download_encodes_filename(client, monkeypatch, filename):
+    webapp = sys.modules["app"]
+    monkeypatch.setattr(webapp, "DOWNLOAD_OFFLOAD", "x-accel")
+    with open(os.path.join(webapp.app.config["UPLOAD_FOLDER"], filename), "wb") as f:
+        f.write(b"Python developer")
+
+    response = client.get("/download/" + quote(filename))
+    assert response.status_code == 200
+    assert "X-Accel-Redirect" in response.headers
+    # Same header send_file builds for a direct download
+    with webapp.app.test_request_context():
+        expected = send_file(io.BytesIO(b""), as_attachment=True, download_name=filename)
+    assert response.headers["Content-Disposition"] == expected.headers["Content-Disposition"]
+    assert parse_options_header(response.headers["Content-Disposition"])[1]["filename"] == filename
@@ -0,0 +1,290 @@
+import os
+import sys
+import time
+import hashlib
+import argparse
+import tempfile
+from collections import Counter
+from datetime import datetime, timezone
+from pymongo import UpdateOne
+from pymongo.errors import DuplicateKeyError
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.db import get_collection
+
+# Content-addressed store for uploaded files:
+#   <root>/blobs/ab/cd/abcd...     (SHA-256 of the bytes, sharded by its first two byte pairs)
+#   <root>/refs/xy/<stored_name>   (holds the blob's SHA-256; xy from the hash of the name)
+# Identical uploads share one blob. Each stored_filename handed out to clients is a
+# reference file next to the blobs, so every worker resolves it without a database
+# round trip. References are also recorded in the `stored_files` collection
+# ({_id: stored_filename, blob: sha256}), and the `blobs` collection counts references
+# per blob; references from before the refs/ directory exist only there.
+#   python utils/blob_store.py migrate uploads webapp/uploads   # move flat uploads into the store
+#   python utils/blob_store.py gc [--grace 3600]                # recount refs, delete orphaned blobs
+BLOB_DIR = "blobs"
+REF_DIR = "refs"
+HASH_CHUNK = 1 << 20
+GC_GRACE_SECONDS = 3600
+GC_BATCH_SIZE = 1000
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class BlobStore:
+    """Hash-sharded blob files under `root`, with their references in MongoDB."""
+
+    def __init__(self, root, files=None, blobs=None):
+        self.root = root
+        self.files = files if files is not None else get_collection("stored_files")
+        self.blobs = blobs if blobs is not None else get_collection("blobs")
+
+    def relative_path(self, digest):
+        return "/".join((BLOB_DIR, digest[:2], digest[2:4], digest))
+
+    def path_for(self, digest):
+        return os.path.join(self.root, BLOB_DIR, digest[:2], digest[2:4], digest)
+
+    def ref_path(self, stored_filename):
+        """Path of the reference file of a stored filename, or None for a name that is not a plain file name."""
+        if (not stored_filename or stored_filename.startswith(".")
+                or any(sep and sep in stored_filename for sep in (os.sep, os.altsep))):
+            return None
+        shard = hashlib.sha256(stored_filename.encode("utf-8")).hexdigest()[:2]
+        return os.path.join(self.root, REF_DIR, shard, stored_filename)
+
+    def put(self, data, digest=None):
+        """Writes the bytes unless an identical blob exists; returns their SHA-256."""
+        digest = digest or hashlib.sha256(data).hexdigest()
+        path = self.path_for(digest)
+        if os.path.exists(path):
+            # Refresh the mtime so a concurrent GC treats the blob as new
+            os.utime(path)
+            return digest
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix=".blob_", dir=os.path.dirname(path))
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        return digest
+
+    def put_file(self, source, digest=None):
+        """Moves a file into the store (dropping it if the blob exists); returns its SHA-256."""
+        digest = digest or file_sha256(source)
+        path = self.path_for(digest)
+        if os.path.exists(path):
+            os.remove(source)
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(source, path)
+        return digest
+
+    def add_ref(self, stored_filename, digest):
+        """Writes the reference file of stored_filename; False if the name refers to another blob."""
+        path = self.ref_path(stored_filename)
+        if path is None:
+            raise ValueError(f"Invalid stored filename: {stored_filename!r}")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix=".ref_", dir=os.path.dirname(path))
+        try:
+            with os.fdopen(fd, "w", encoding="ascii") as f:
+                f.write(digest)
+            # A hard link publishes the complete file and fails if the name is taken
+            os.link(tmp_path, path)
+        except FileExistsError:
+            return self.read_ref(stored_filename) == digest
+        finally:
+            os.remove(tmp_path)
+        return True
+
+    def read_ref(self, stored_filename):
+        path = self.ref_path(stored_filename)
+        if path is None:
+            return None
+        try:
+            with open(path, "r", encoding="ascii") as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def record(self, stored_filename, digest):
+        """Records the reference in MongoDB and counts it; False if the name maps to another blob."""
+        now = datetime.now(timezone.utc)
+        try:
+            result = self.files.update_one(
+                {"_id": stored_filename},
+                {"$setOnInsert": {"blob": digest, "created_at": now}},
+                upsert=True
+            )
+        except DuplicateKeyError:
+            # Two writers linked the same name at once; the other insert won
+            result = None
+        if result is not None and result.upserted_id is not None:
+            self.blobs.update_one(
+                {"_id": digest},
+                {"$inc": {"refs": 1}, "$setOnInsert": {"created_at": now}},
+                upsert=True
+            )
+            return True
+        doc = self.files.find_one({"_id": stored_filename}, {"blob": 1})
+        return doc is not None and doc["blob"] == digest
+
+    def link(self, stored_filename, digest):
+        """Records stored_filename as a reference to the blob; False if the name maps to another blob."""
+        return self.add_ref(stored_filename, digest) and self.record(stored_filename, digest)
+
+    def unlink(self, stored_filename):
+        """Drops a reference; the blob itself is deleted by gc() once nothing refers to it."""
+        path = self.ref_path(stored_filename)
+        if path is not None and os.path.exists(path):
+            os.remove(path)
+        doc = self.files.find_one_and_delete({"_id": stored_filename})
+        if doc:
+            self.blobs.update_one({"_id": doc["blob"]}, {"$inc": {"refs": -1}})
+
+    def store(self, stored_filename, data, digest=None):
+        """Writes the blob, then references it (a crash in between leaves an orphan for GC, never a dangling name)."""
+        digest = self.put(data, digest)
+        self.link(stored_filename, digest)
+        return digest
+
+    def resolve(self, stored_filename):
+        """The blob digest of a stored filename, or None if it is not in the store."""
+        digest = self.read_ref(stored_filename)
+        if digest is not None:
+            return digest
+        # References written before the refs/ directory are only in MongoDB
+        doc = self.files.find_one({"_id": stored_filename}, {"blob": 1})
+        return doc["blob"] if doc else None
+
+    def iter_refs(self):
+        """(stored_filename, digest) of every reference file."""
+        base = os.path.join(self.root, REF_DIR)
+        for dirpath, _, filenames in os.walk(base):
+            for name in filenames:
+                if not name.startswith("."):
+                    digest = self.read_ref(name)
+                    if digest:
+                        yield name, digest
+
+    def iter_blob_paths(self):
+        base = os.path.join(self.root, BLOB_DIR)
+        for dirpath, _, filenames in os.walk(base):
+            for name in filenames:
+                if not name.startswith("."):
+                    yield name, os.path.join(dirpath, name)
+
+
+def migrate(store, folders):
+    """Moves every flat file of `folders` into the store, keeping its name as a reference."""
+    moved = deduplicated = skipped = 0
+    for folder in folders:
+        if not os.path.isdir(folder):
+            print(f"Skipping {folder}: not a directory")
+            continue
+        for name in sorted(os.listdir(folder)):
+            source = os.path.join(folder, name)
+            if not os.path.isfile(source) or name.startswith("."):
+                continue
+            digest = file_sha256(source)
+            existing = store.resolve(name)
+            if existing is not None and existing != digest:
+                print(f"Kept {source}: the name already refers to different content")
+                skipped += 1
+                continue
+            had_blob = os.path.exists(store.path_for(digest))
+            store.put_file(source, digest)
+            store.link(name, digest)
+            deduplicated += had_blob
+            moved += 1
+    print(f"Migrated {moved} files ({deduplicated} duplicates of existing blobs), kept {skipped}")
+
+
+def gc(store, grace_seconds=GC_GRACE_SECONDS):
+    """Recounts references and deletes blobs no stored filename refers to."""
+    refs = Counter()
+    named = set()
+    for name, digest in store.iter_refs():
+        refs[digest] += 1
+        named.add(name)
+    # Plus the references that have no file yet (recorded before the refs/ directory)
+    for doc in store.files.find({}, {"blob": 1}):
+        if doc["_id"] not in named:
+            refs[doc["blob"]] += 1
+    # Fix counts that drifted (e.g. a crash between the two writes of link()) and count
+    # blobs that have no document yet. One pass over the cursor: the digests are never
+    # sent in a single query, which would outgrow the 16 MiB command limit.
+    uncounted = set(refs)
+    updates = []
+    for doc in store.blobs.find({}, {"refs": 1}):
+        uncounted.discard(doc["_id"])
+        if doc.get("refs", 0) != refs.get(doc["_id"], 0):
+            updates.append(UpdateOne({"_id": doc["_id"]}, {"$set": {"refs": refs.get(doc["_id"], 0)}}))
+            if len(updates) >= GC_BATCH_SIZE:
+                store.blobs.bulk_write(updates, ordered=False)
+                updates = []
+    now = datetime.now(timezone.utc)
+    for digest in uncounted:
+        updates.append(UpdateOne(
+            {"_id": digest}, {"$set": {"refs": refs[digest]}, "$setOnInsert": {"created_at": now}}, upsert=True
+        ))
+        if len(updates) >= GC_BATCH_SIZE:
+            store.blobs.bulk_write(updates, ordered=False)
+            updates = []
+    if updates:
+        store.blobs.bulk_write(updates, ordered=False)
+
+    # Only blobs older than the grace period: a concurrent upload writes its blob before linking it
+    cutoff = time.time() - grace_seconds
+    removed = freed = 0
+    for digest, path in store.iter_blob_paths():
+        if refs.get(digest):
+            continue
+        try:
+            stat = os.stat(path)
+            if stat.st_mtime > cutoff:
+                continue
+            os.remove(path)
+        except OSError:
+            continue
+        store.blobs.delete_one({"_id": digest, "refs": {"$lte": 0}})
+        removed += 1
+        freed += stat.st_size
+
+    # Compaction: drop shard directories left empty
+    base = os.path.join(store.root, BLOB_DIR)
+    for dirpath, dirnames, filenames in os.walk(base, topdown=False):
+        if dirpath != base and not dirnames and not filenames:
+            try:
+                os.rmdir(dirpath)
+            except OSError:
+                pass
+    print(f"Removed {removed} orphaned blobs ({freed} bytes); {len(refs)} blobs are referenced")
+
+
+def default_root():
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return os.environ.get("UPLOAD_FOLDER", os.path.join(project_root, "webapp", "uploads"))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Maintain the content-addressed upload store.")
+    parser.add_argument("--root", default=default_root(), help="store root (the webapp's UPLOAD_FOLDER)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    migrate_parser = commands.add_parser("migrate", help="move flat upload folders into the store")
+    migrate_parser.add_argument("folders", nargs="*", help="default: the store root itself")
+    gc_parser = commands.add_parser("gc", help="recount references and delete orphaned blobs")
+    gc_parser.add_argument("--grace", type=int, default=GC_GRACE_SECONDS, help="minimum blob age in seconds")
+    args = parser.parse_args()
+
+    blob_store = BlobStore(args.root)
+    if args.command == "migrate":
+        migrate(blob_store, args.folders or [args.root])
+    else:
+        gc(blob_store, args.grace)
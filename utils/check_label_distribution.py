@@ -1,14 +1,16 @@
-from pymongo import MongoClient
+import os
+import sys
 from collections import Counter
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.db import get_collection
+
 def connect_to_mongo():
-    client = MongoClient("mongodb://localhost:27017/")
-    db = client["resume_screening"]
-    return db["predictions"]
+    return get_collection("predictions")
 
 def check_label_distribution():
     collection = connect_to_mongo()
-    resumes = collection.find({"category": {"$exists": True}})
+    resumes = collection.find({"category": {"$exists": True}}, {"_id": 0, "category": 1})
     
     labels = [doc["category"].strip().lower() for doc in resumes if "category" in doc and doc["category"]]
     
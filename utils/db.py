@@ -0,0 +1,101 @@
+import os
+import threading
+from pymongo import MongoClient, ASCENDING, DESCENDING
+from pymongo.errors import OperationFailure
+
+# Shared MongoDB access for the webapp and the offline tools in utils/ and pipeline/.
+MONGO_URI = os.environ.get("MONGO_URI", "mongodb://localhost:27017/resume_screening")
+DEFAULT_DB = os.environ.get("MONGO_DB", "resume_screening")
+
+# One connection pool per process; tune with env vars per deployment
+CLIENT_OPTIONS = {
+    "maxPoolSize": int(os.environ.get("MONGO_MAX_POOL_SIZE", "50")),
+    "minPoolSize": int(os.environ.get("MONGO_MIN_POOL_SIZE", "0")),
+    "maxIdleTimeMS": int(os.environ.get("MONGO_MAX_IDLE_MS", "60000")),
+    "serverSelectionTimeoutMS": int(os.environ.get("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000")),
+    "connectTimeoutMS": int(os.environ.get("MONGO_CONNECT_TIMEOUT_MS", "5000")),
+    "socketTimeoutMS": int(os.environ.get("MONGO_SOCKET_TIMEOUT_MS", "30000")),
+    "retryWrites": True,
+}
+
+# collection -> [(keys, options), ...]
+INDEXES = {
+    "users": [
+        ([("email", ASCENDING)], {"unique": True}),
+    ],
+    "uploads": [
+        # Older documents have no hash, hence sparse
+        ([("content_hash", ASCENDING)], {"unique": True, "sparse": True}),
+        ([("uploaded_at", DESCENDING)], {}),
+        ([("stored_filename", ASCENDING)], {}),
+    ],
+    "predictions": [
+        ([("category", ASCENDING)], {}),
+        ([("filename", ASCENDING)], {}),
+    ],
+    "score_cache": [
+        # Shared tier of the ranking result cache (utils/result_cache.py)
+        ([("expires_at", ASCENDING)], {"expireAfterSeconds": 0}),
+    ],
+}
+
+_client = None
+_client_pid = None
+_lock = threading.Lock()
+
+
+def get_client():
+    """Returns this process's MongoClient, creating it on first use (and again after a fork)."""
+    global _client, _client_pid
+    with _lock:
+        if _client is None or _client_pid != os.getpid():
+            _client = MongoClient(MONGO_URI, **CLIENT_OPTIONS)
+            _client_pid = os.getpid()
+        return _client
+
+
+def get_db():
+    """Returns the database named in MONGO_URI, or MONGO_DB when the URI has none."""
+    client = get_client()
+    db = client.get_database()
+    return db if db.name else client[DEFAULT_DB]
+
+
+def get_collection(name):
+    return get_db()[name]
+
+
+class LazyCollection:
+    """Collection handle that looks up this process's client on every use.
+
+    Safe to create at import time in a preloaded gunicorn master: after the
+    fork each worker transparently uses its own connection pool.
+    """
+
+    def __init__(self, name):
+        self.name = name
+
+    def __getattr__(self, attr):
+        return getattr(get_collection(self.name), attr)
+
+
+def ensure_indexes(db=None, job_ttl_seconds=None):
+    """Creates the indexes the app and tools query by; safe to call on every start."""
+    db = db if db is not None else get_db()
+    indexes = dict(INDEXES)
+    if job_ttl_seconds is not None:
+        # Finished screening jobs are only kept around long enough to be fetched
+        indexes["jobs"] = [([("created_at", ASCENDING)], {"expireAfterSeconds": job_ttl_seconds})]
+
+    for name, specs in indexes.items():
+        for keys, options in specs:
+            try:
+                db[name].create_index(keys, **options)
+            except OperationFailure as e:
+                # e.g. existing duplicate emails block the unique index: report, keep serving
+                print(f"Could not create index {keys} on {name}: {e}")
+
+
+if __name__ == "__main__":
+    ensure_indexes()
+    print("Indexes are up to date.")
@@ -1,36 +1,60 @@
 import os
+import sys
 import fitz  # PyMuPDF
 import docx
-import nltk
-import string
 
-from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.extraction_pool import ExtractionPool
+from utils.text_normalizer import normalize, normalize_many, STOPWORDS
+from utils.manifest import Manifest
 
-# Setup
-nltk.download("punkt")
-nltk.download("stopwords")
-STOPWORDS = set(stopwords.words("english"))
+# Records which source files the cleaned .txt files are up to date with
+SOURCE_MANIFEST = ".source_manifest.json"
+MANIFEST_CHUNK = 500
 
 def extract_text_from_pdf(file_path):
-    text = ""
+    pages = []
     try:
         with fitz.open(file_path) as doc:
-            for page in doc:
-                text += page.get_text()
+            pages = [page.get_text() for page in doc]
     except Exception as e:
         print(f"Error reading PDF {file_path}: {e}")
-    return text
+    return "".join(pages)
 
 def extract_text_from_docx(file_path):
-    text = ""
+    paragraphs = []
     try:
         doc = docx.Document(file_path)
-        for para in doc.paragraphs:
-            text += para.text + "\n"
+        paragraphs = [para.text + "\n" for para in doc.paragraphs]
     except Exception as e:
         print(f"Error reading DOCX {file_path}: {e}")
-    return text
+    return "".join(paragraphs)
+
+def extract_upload(upload, max_pages, max_chars):
+    """Extracts text from an in-memory (filename, bytes) upload; returns (text, pdf pages parsed).
+
+    Runs in the extraction pool's processes, so it lives here rather than in the webapp.
+    """
+    filename, data = upload
+    ext = os.path.splitext(filename)[1].lower()
+    text = ""
+    pages = []
+    try:
+        if ext == '.txt':
+            text = data[:max_chars * 4].decode('utf-8', errors='ignore')
+        elif ext == '.pdf':
+            # Parse straight from memory, page by page, up to the configured limits
+            size = 0
+            with fitz.open(stream=data, filetype="pdf") as doc:
+                for page in doc.pages(0, min(doc.page_count, max_pages)):
+                    pages.append(page.get_text())
+                    size += len(pages[-1])
+                    if size >= max_chars:
+                        break
+            text = "".join(pages)
+    except Exception as e:
+        print(f"Error extracting text from {filename}: {e}")
+    return text[:max_chars], len(pages)
 
 def extract_text(file_path):
     if file_path.lower().endswith(".pdf"):
@@ -42,45 +66,79 @@ def extract_text(file_path):
         return ""
 
 def clean_text(text):
+    # Lowercase, tokenize, drop punctuation and stopwords (utils/text_normalizer.py)
     try:
-        if not text or not isinstance(text, str):
-            return ""
-
-        # Lowercase
-        text = text.lower()
-
-        # Tokenize
-        tokens = word_tokenize(text)
-
-        # Remove punctuation and stopwords
-        tokens = [
-            t for t in tokens
-            if t.isalpha() and t not in STOPWORDS
-        ]
-
-        return ' '.join(tokens)
-
+        return normalize(text)
     except Exception as e:
         print(f"Error cleaning text: {e}")
         return ""
 
+def clean_texts(texts):
+    """clean_text() for many documents in one call."""
+    try:
+        return normalize_many(texts)
+    except Exception as e:
+        print(f"Error cleaning texts: {e}")
+        return [clean_text(t) for t in texts]
 
-def extract_all_from_folder(input_folder, output_folder):
-    os.makedirs(output_folder, exist_ok=True)
-    for filename in os.listdir(input_folder):
-        if filename.lower().endswith((".pdf", ".docx")):
-            print(f"Processing: {filename}")
-            file_path = os.path.join(input_folder, filename)
-            raw_text = extract_text(file_path)
-            cleaned = clean_text(raw_text)
 
-            output_file = os.path.join(output_folder, filename.rsplit('.', 1)[0] + '.txt')
-            with open(output_file, 'w', encoding='utf-8') as f:
-                f.write(cleaned)
+def extract_and_clean(file_path):
+    return clean_text(extract_text(file_path))
 
-            print(f"Saved cleaned text to: {output_file}")
+def output_filename(filename):
+    return filename.rsplit('.', 1)[0] + '.txt'
+
+def extract_all_from_folder(input_folder, output_folder, pool=None, full=False):
+    """Extracts and cleans the new or changed PDF/DOCX files of input_folder into output_folder.
+
+    What was processed is recorded in output_folder/SOURCE_MANIFEST; full=True reprocesses everything.
+    Outputs of source files that were deleted are removed.
+    """
+    os.makedirs(output_folder, exist_ok=True)
+    filenames = [
+        filename for filename in sorted(os.listdir(input_folder))
+        if filename.lower().endswith((".pdf", ".docx"))
+    ]
+    manifest = Manifest(os.path.join(output_folder, SOURCE_MANIFEST))
+    changed, deleted = manifest.scan(input_folder, filenames, full=full)
+    print(f"{len(filenames)} files: {len(changed)} new or changed, {len(deleted)} deleted")
+
+    # Only remove an output no remaining source file maps to (e.g. a.pdf replaced by a.docx)
+    outputs = {output_filename(filename) for filename in filenames}
+    for filename in deleted:
+        manifest.forget(filename)
+        output_file = os.path.join(output_folder, output_filename(filename))
+        if output_filename(filename) not in outputs and os.path.exists(output_file):
+            os.remove(output_file)
+            print(f"Removed: {output_file}")
+
+    # Parse in parallel on every core; results come back in filename order. The manifest
+    # is saved after every chunk, so an interrupted run resumes where it stopped.
+    names = sorted(changed)
+    own_pool = pool is None and bool(names)
+    if own_pool:
+        pool = ExtractionPool(processes=os.cpu_count() or 1)
+    try:
+        for start in range(0, len(names), MANIFEST_CHUNK):
+            chunk = names[start:start + MANIFEST_CHUNK]
+            cleaned_texts = pool.map(extract_and_clean, [os.path.join(input_folder, f) for f in chunk])
+            for filename, cleaned in zip(chunk, cleaned_texts):
+                output_file = os.path.join(output_folder, output_filename(filename))
+                with open(output_file, 'w', encoding='utf-8') as f:
+                    f.write(cleaned)
+                # Files that yielded no text (parse error, timeout) are retried on the next run
+                if cleaned:
+                    manifest.record(filename, changed[filename])
+
+                print(f"Saved cleaned text to: {output_file}")
+            manifest.save()
+    finally:
+        if own_pool:
+            pool.close()
+
+    manifest.save()
 
 if __name__ == "__main__":
     input_dir = "data/resumes"
     output_dir = "data/cleaned_resumes"
-    extract_all_from_folder(input_dir, output_dir)
+    extract_all_from_folder(input_dir, output_dir, full="--full" in sys.argv[1:])
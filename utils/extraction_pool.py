@@ -0,0 +1,115 @@
+import os
+import threading
+import multiprocessing
+
+# Defaults can be overridden per deployment; keep the worker count modest because
+# every gunicorn worker owns its own pool. EXTRACT_WORKERS=0 extracts in the calling
+# process instead: no parallelism and no timeout (a hung parser blocks the request).
+EXTRACT_WORKERS = int(os.environ.get("EXTRACT_WORKERS", min(4, os.cpu_count() or 1)))
+EXTRACT_TIMEOUT = float(os.environ.get("EXTRACT_TIMEOUT", "30"))
+EXTRACT_TASKS_PER_CHILD = 200
+# Imported once by the fork server, so new pool processes start with the parsers loaded
+EXTRACT_PRELOAD = ["utils.extract_text"]
+
+
+def _context():
+    # The pool is created (and, with maxtasksperchild, refilled) inside a web worker
+    # that already runs threads; forking it could copy a lock another thread holds.
+    # The fork server is a single-threaded process the children are forked from instead.
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload(EXTRACT_PRELOAD)
+        return context
+    return multiprocessing.get_context("spawn")
+
+
+class ExtractionPool:
+    """Bounded, reusable process pool for CPU-bound text extraction.
+
+    The pool is created lazily on first use (so gunicorn forks before it
+    exists) and reused across calls. `map` returns results in input order;
+    a file that fails or exceeds `timeout` seconds yields `default`
+    instead of stalling the batch, and the stuck worker is killed.
+    `func` must be a module-level function (or a partial of one): the worker
+    processes do not inherit the caller's memory and import it by name.
+    """
+
+    def __init__(self, processes=EXTRACT_WORKERS, timeout=EXTRACT_TIMEOUT):
+        self.processes = processes
+        self.timeout = timeout
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def _get_pool(self):
+        with self._lock:
+            if self._pool is None:
+                self._pool = _context().Pool(self.processes, maxtasksperchild=EXTRACT_TASKS_PER_CHILD)
+            return self._pool
+
+    def start(self):
+        """Creates the pool now rather than on the first request that needs it."""
+        if self.processes > 0:
+            self._get_pool()
+
+    def _recycle(self, pool):
+        """Retires a pool holding a hung worker; new work goes to a fresh pool."""
+        with self._lock:
+            if self._pool is pool:
+                self._pool = None
+        pool.close()
+        # Give tasks of other concurrent callers their full timeout before killing it
+        timer = threading.Timer(self.timeout, pool.terminate)
+        timer.daemon = True
+        timer.start()
+
+    def map(self, func, items, default="", names=None):
+        """Applies `func` to every item in parallel and returns the results in order.
+
+        `names` optionally labels the items in log messages (e.g. when items are raw bytes).
+        """
+        return list(self.imap(func, items, default, names))
+
+    def imap(self, func, items, default="", names=None):
+        """Like map, but yields each result as soon as it and all earlier ones are done."""
+        items = list(items)
+        if not items:
+            return
+        names = names or items
+        if self.processes <= 0:
+            for item, name in zip(items, names):
+                yield _call(func, item, name, default)
+            return
+
+        pool = self._get_pool()
+        pending = [pool.apply_async(func, (item,)) for item in items]
+        hung = False
+        try:
+            for name, result in zip(names, pending):
+                try:
+                    value = result.get(self.timeout)
+                except multiprocessing.TimeoutError:
+                    print(f"Extraction timed out after {self.timeout}s: {name}")
+                    value = default
+                    hung = True
+                except Exception as e:
+                    print(f"Extraction failed for {name}: {e}")
+                    value = default
+                yield value
+        finally:
+            # Also when the consumer stops early (e.g. a streaming client disconnected)
+            if hung:
+                self._recycle(pool)
+
+    def close(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.terminate()
+
+
+def _call(func, item, name, default):
+    try:
+        return func(item)
+    except Exception as e:
+        print(f"Extraction failed for {name}: {e}")
+        return default
@@ -0,0 +1,134 @@
+import os
+import json
+import shutil
+import hashlib
+import tempfile
+import numpy as np
+import sklearn
+from scipy import sparse
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import train_test_split, GridSearchCV
+
+from utils.model_store import save_model, load_model, COMPACT_SUFFIX
+
+# Vectorized train/test splits, keyed by a fingerprint of corpus + preprocessing config:
+#   cache/features/<key>/{X_train,X_test}.npz  y_{train,test}.npy  vectorizer.joblib (vocabulary, IDF)
+FEATURE_CACHE_DIR = os.environ.get("FEATURE_CACHE_DIR", os.path.join("cache", "features"))
+VECTORIZER_FILE = "vectorizer" + COMPACT_SUFFIX
+
+# Default grid for the parallel hyperparameter search
+PARAM_GRID = {"C": [0.1, 1.0, 10.0], "class_weight": [None, "balanced"]}
+
+
+def default_vectorizer():
+    return TfidfVectorizer(stop_words='english')
+
+
+def corpus_fingerprint(texts, labels, config):
+    """SHA-256 over the preprocessing config and every (text, label) pair, in order."""
+    digest = hashlib.sha256(json.dumps(config, sort_keys=True, default=str).encode("utf-8"))
+    for text, label in zip(texts, labels):
+        digest.update(hashlib.sha256(text.encode("utf-8")).digest())
+        digest.update(label.encode("utf-8") + b"\0")
+    return digest.hexdigest()
+
+
+class FeatureCache:
+    """Directory of vectorized training splits; at most `max_entries` are kept."""
+
+    def __init__(self, root=FEATURE_CACHE_DIR, max_entries=5):
+        self.root = root
+        self.max_entries = max_entries
+
+    def load(self, key):
+        """Returns (vectorizer, X_train, X_test, y_train, y_test), or None on a miss."""
+        path = os.path.join(self.root, key)
+        if not os.path.isdir(path):
+            return None
+        try:
+            vectorizer = load_model(os.path.join(path, VECTORIZER_FILE))
+            X_train = sparse.load_npz(os.path.join(path, "X_train.npz"))
+            X_test = sparse.load_npz(os.path.join(path, "X_test.npz"))
+            y_train = np.load(os.path.join(path, "y_train.npy"), allow_pickle=False)
+            y_test = np.load(os.path.join(path, "y_test.npy"), allow_pickle=False)
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable feature cache {path}: {e}")
+            return None
+        os.utime(path)
+        return vectorizer, X_train, X_test, y_train, y_test
+
+    def save(self, key, vectorizer, X_train, X_test, y_train, y_test):
+        os.makedirs(self.root, exist_ok=True)
+        tmp_dir = tempfile.mkdtemp(prefix=".features_", dir=self.root)
+        save_model(vectorizer, os.path.join(tmp_dir, VECTORIZER_FILE))
+        sparse.save_npz(os.path.join(tmp_dir, "X_train.npz"), sparse.csr_matrix(X_train))
+        sparse.save_npz(os.path.join(tmp_dir, "X_test.npz"), sparse.csr_matrix(X_test))
+        np.save(os.path.join(tmp_dir, "y_train.npy"), np.asarray(y_train, dtype=str))
+        np.save(os.path.join(tmp_dir, "y_test.npy"), np.asarray(y_test, dtype=str))
+
+        path = os.path.join(self.root, key)
+        try:
+            os.rename(tmp_dir, path)
+        except OSError:
+            # Another run cached the same key first
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+        self.prune()
+
+    def prune(self):
+        entries = [
+            os.path.join(self.root, name) for name in os.listdir(self.root)
+            if not name.startswith(".")
+        ]
+        entries.sort(key=os.path.getmtime, reverse=True)
+        for path in entries[self.max_entries:]:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def vectorize_split(texts, labels, cache=None, vectorizer=None, test_size=0.3, random_state=42):
+    """Splits the corpus and returns (vectorizer, X_train, X_test, y_train, y_test).
+
+    The vectorizer is fit on the training split only. When the corpus and
+    config fingerprint is already cached, nothing is tokenized.
+    """
+    vectorizer = vectorizer if vectorizer is not None else default_vectorizer()
+    cache = cache if cache is not None else FeatureCache()
+    config = {
+        "vectorizer": type(vectorizer).__name__,
+        "params": vectorizer.get_params(),
+        "test_size": test_size,
+        "random_state": random_state,
+        "sklearn": sklearn.__version__,
+    }
+    key = corpus_fingerprint(texts, labels, config)
+
+    cached = cache.load(key)
+    if cached is not None:
+        print(f"Reusing cached feature matrix {key[:12]}")
+        return cached
+
+    X_train_text, X_test_text, y_train, y_test = train_test_split(
+        texts, labels, test_size=test_size, random_state=random_state
+    )
+    X_train = vectorizer.fit_transform(X_train_text)
+    X_test = vectorizer.transform(X_test_text)
+    cache.save(key, vectorizer, X_train, X_test, y_train, y_test)
+    return vectorizer, X_train, X_test, np.asarray(y_train), np.asarray(y_test)
+
+
+def tune_classifier(X_train, y_train, param_grid=None, cv=5, n_jobs=-1):
+    """Cross-validated grid search over LogisticRegression on an already vectorized matrix.
+
+    Folds share the vocabulary/IDF fit on the whole training split, which
+    is what makes the search cheap; the final holdout stays untouched.
+    """
+    search = GridSearchCV(
+        LogisticRegression(max_iter=1000),
+        param_grid or PARAM_GRID,
+        cv=cv,
+        n_jobs=n_jobs,
+        scoring="accuracy",
+    )
+    search.fit(X_train, y_train)
+    print(f"Best parameters: {search.best_params_} (cv accuracy {search.best_score_:.4f})")
+    return search.best_estimator_, search.best_params_
@@ -1,5 +1,9 @@
+import os
+import sys
 import pandas as pd
-from pymongo import MongoClient
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.db import get_client, get_collection
 
 try:
     # Load CSV
@@ -11,9 +15,7 @@ except Exception as e:
 
 try:
     # Connect to MongoDB
-    client = MongoClient("mongodb://localhost:27017/", serverSelectionTimeoutMS=5000)
-    db = client["resume_screening"]
-    collection = db["predictions"]
+    collection = get_collection("predictions")
 
     # Clear old data
     collection.delete_many({})
@@ -34,5 +36,5 @@ try:
 except Exception as e:
     print("Error during MongoDB operations:", e)
 finally:
-    client.close()
+    get_client().close()
     print("Import complete.")
\ No newline at end of file
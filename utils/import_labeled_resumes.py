@@ -1,42 +1,94 @@
 import os
+import sys
 from datetime import datetime, timezone
-from pymongo import MongoClient
+from pymongo import UpdateOne, DeleteMany
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.db import get_collection
+from utils.manifest import Manifest
 
 # MongoDB connection
 def connect_to_mongo():
-    client = MongoClient("mongodb://localhost:27017/")
-    db = client["resume_screening"]
-    return db["predictions"]
+    return get_collection("predictions")
 
 # Extract label from filename (e.g., "resume_john_data.txt" → "data")
 def extract_label(filename):
     return filename.rsplit('.', 1)[0].split('_')[-1]
 
-# Import all cleaned resumes from the folder into MongoDB
-def import_cleaned_resumes(folder_path):
+# Labeled resumes imported from the cleaned folder (other predictions documents have no text)
+LABELED = {"resume": {"$exists": True}}
+IMPORT_MANIFEST = ".import_manifest.json"
+BATCH_SIZE = 500
+
+# Keeps the oldest document per filename; earlier full imports inserted duplicates
+def remove_duplicates(collection):
+    duplicates = collection.aggregate([
+        {"$match": LABELED},
+        {"$group": {"_id": "$filename", "ids": {"$push": "$_id"}, "count": {"$sum": 1}}},
+        {"$match": {"count": {"$gt": 1}}},
+    ])
+    extra = [_id for group in duplicates for _id in sorted(group["ids"])[1:]]
+    if extra:
+        collection.delete_many({"_id": {"$in": extra}})
+        print(f"Removed {len(extra)} duplicate documents")
+
+# Upserts the new or changed cleaned resumes of the folder into MongoDB and deletes the
+# documents of files removed from it; full=True re-imports every file
+def import_cleaned_resumes(folder_path, full=False):
     collection = connect_to_mongo()
+    manifest = Manifest(os.path.join(folder_path, IMPORT_MANIFEST))
+    if full or not manifest.exists:
+        remove_duplicates(collection)
 
-    for fname in os.listdir(folder_path):
-        if fname.endswith(".txt"):
+    filenames = sorted(fname for fname in os.listdir(folder_path) if fname.endswith(".txt"))
+    changed, deleted = manifest.scan(folder_path, filenames, full=full)
+    print(f"{len(filenames)} files: {len(changed)} new or changed, {len(deleted)} deleted")
+
+    if deleted:
+        collection.delete_many({"filename": {"$in": deleted}, **LABELED})
+        for fname in deleted:
+            manifest.forget(fname)
+            print(f"Deleted: {fname}")
+
+    names = sorted(changed)
+    for start in range(0, len(names), BATCH_SIZE):
+        # One unordered bulk_write per batch instead of a round trip per file
+        requests, done = [], []
+        for fname in names[start:start + BATCH_SIZE]:
             path = os.path.join(folder_path, fname)
 
             with open(path, 'r', encoding='utf-8') as f:
                 text = f.read().strip()
 
             if not text:
-                print(f"Skipped empty file: {fname}")
+                # A previously imported resume that is now empty is removed
+                requests.append(DeleteMany({"filename": fname, **LABELED}))
+                done.append((fname, f"Skipped empty file: {fname}"))
                 continue
 
             label = extract_label(fname)
-            doc = {
-                "filename": fname,
-                "resume": text,
-                "category": label,
-                "timestamp": datetime.now(timezone.utc)
-            }
+            requests.append(UpdateOne(
+                {"filename": fname, **LABELED},
+                {"$set": {
+                    "filename": fname,
+                    "resume": text,
+                    "category": label,
+                    "content_hash": changed[fname]["sha256"],
+                    "timestamp": datetime.now(timezone.utc)
+                }},
+                upsert=True,
+            ))
+            done.append((fname, f"Imported: {fname} -> {label}"))
+
+        if requests:
+            collection.bulk_write(requests, ordered=False)
+        # Recorded only once the batch is written, so a failed run retries it
+        for fname, message in done:
+            manifest.record(fname, changed[fname])
+            print(message)
+        manifest.save()
 
-            collection.insert_one(doc)
-            print(f"Imported: {fname} -> {label}")
+    manifest.save()
 
 if __name__ == "__main__":
-    import_cleaned_resumes("data/cleaned_resumes")
+    import_cleaned_resumes("data/cleaned_resumes", full="--full" in sys.argv[1:])
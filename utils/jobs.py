@@ -0,0 +1,137 @@
+import queue
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
+
+ACTIVE_STATUSES = ("queued", "running")
+
+
+class QueueFull(Exception):
+    """Raised by JobQueue.put when no more jobs can be accepted right now."""
+
+
+class JobQueue:
+    """Interface for screening-job queues.
+
+    `put` hands over a job id with its payload (uploaded bytes etc.) and
+    raises QueueFull instead of blocking when the queue is at capacity;
+    `get` blocks for the next one. Implementations backed by an external
+    broker can be swapped in without touching the workers.
+    """
+
+    def put(self, job_id, payload):
+        raise NotImplementedError
+
+    def get(self):
+        raise NotImplementedError
+
+
+class InProcessQueue(JobQueue):
+    """Queue living in the submitting process; needs no outside services.
+
+    Payloads hold the raw uploads, so `maxsize` bounds the memory queued jobs take.
+    """
+
+    def __init__(self, maxsize=0):
+        self._queue = queue.Queue(maxsize)
+
+    def put(self, job_id, payload):
+        try:
+            self._queue.put_nowait((job_id, payload))
+        except queue.Full:
+            raise QueueFull(f"{self._queue.maxsize} jobs are already waiting") from None
+
+    def get(self):
+        return self._queue.get()
+
+
+class JobStore:
+    """Job status, progress and results kept in MongoDB so any worker can answer a poll."""
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    def create(self, total):
+        job_id = uuid.uuid4().hex
+        now = datetime.now(timezone.utc)
+        self.collection.insert_one({
+            "_id": job_id,
+            "status": "queued",
+            "total": total,
+            "processed": 0,
+            "created_at": now,
+            "updated_at": now
+        })
+        return job_id
+
+    def _set(self, job_id, **fields):
+        self.collection.update_one({"_id": job_id}, {"$set": {**fields, "updated_at": datetime.now(timezone.utc)}})
+
+    def start(self, job_id):
+        self._set(job_id, status="running", started_at=datetime.now(timezone.utc))
+
+    def progress(self, job_id, processed):
+        self._set(job_id, processed=processed)
+
+    def finish(self, job_id, results, model_version=None):
+        self._set(job_id, status="done", results=results, model_version=model_version,
+                  finished_at=datetime.now(timezone.utc))
+
+    def fail(self, job_id, error):
+        self._set(job_id, status="failed", error=error, finished_at=datetime.now(timezone.utc))
+
+    def fail_stale(self, max_age_seconds, job_id=None):
+        """Fails queued or running jobs without an update for max_age_seconds (their worker
+        restarted or was killed), so clients stop polling them. Returns how many were failed."""
+        now = datetime.now(timezone.utc)
+        cutoff = now - timedelta(seconds=max_age_seconds)
+        query = {
+            "status": {"$in": list(ACTIVE_STATUSES)},
+            # Jobs created before updated_at was recorded only have created_at
+            "$or": [
+                {"updated_at": {"$lt": cutoff}},
+                {"updated_at": {"$exists": False}, "created_at": {"$lt": cutoff}}
+            ]
+        }
+        if job_id is not None:
+            query["_id"] = job_id
+        result = self.collection.update_many(query, {"$set": {
+            "status": "failed",
+            "error": "The job was interrupted on the server. Please submit it again.",
+            "finished_at": now,
+            "updated_at": now
+        }})
+        return result.modified_count
+
+    def get(self, job_id):
+        return self.collection.find_one({"_id": job_id})
+
+
+class JobWorkers:
+    """A fixed number of daemon threads running `handler(job_id, payload)` for queued jobs.
+
+    Threads are started on the first submission, i.e. after gunicorn has forked.
+    """
+
+    def __init__(self, job_queue, handler, workers=2):
+        self.queue = job_queue
+        self.handler = handler
+        self.workers = workers
+        self._threads = []
+        self._lock = threading.Lock()
+
+    def _run(self):
+        while True:
+            job_id, payload = self.queue.get()
+            try:
+                self.handler(job_id, payload)
+            except Exception as e:
+                print(f"Job {job_id} crashed: {e}")
+
+    def submit(self, job_id, payload):
+        with self._lock:
+            while len(self._threads) < self.workers:
+                thread = threading.Thread(target=self._run, name=f"job-worker-{len(self._threads)}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+        self.queue.put(job_id, payload)
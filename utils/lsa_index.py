@@ -0,0 +1,146 @@
+import os
+import json
+import pickle
+import shutil
+import tempfile
+import numpy as np
+from sklearn.decomposition import TruncatedSVD
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from utils.tfidf_index import top_k
+
+# Low-rank semantic (LSA) index directory layout:
+#   vectorizer.pkl   TfidfVectorizer fitted on the corpus (bounded vocabulary)
+#   components.npy   float32 (n_components, n_terms): TF-IDF space -> LSA space
+#   vectors.npy      float32 (n_resumes, n_components), C-contiguous, rows L2-normalised
+#   meta.json        content hash of every row, explained variance
+# Memory is n_resumes * n_components * 4 bytes however long the resumes are, and both
+# arrays are memory-mapped, so gunicorn workers share one copy through the page cache.
+VECTORIZER_FILE = "vectorizer.pkl"
+COMPONENTS_FILE = "components.npy"
+VECTORS_FILE = "vectors.npy"
+META_FILE = "meta.json"
+
+LSA_COMPONENTS = 256
+LSA_MAX_FEATURES = 50000
+
+
+def _unit_rows(vectors):
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+class LsaIndex:
+    """Dense low-dimensional vectors of the stored resume corpus, addressed by content hash."""
+
+    def __init__(self, vectorizer, components, vectors, ids, explained_variance=None):
+        self.vectorizer = vectorizer
+        self.components = components
+        self.vectors = vectors
+        self.ids = list(ids)
+        self.positions = {h: i for i, h in enumerate(self.ids)}
+        self.explained_variance = explained_variance
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def n_components(self):
+        return self.components.shape[0]
+
+    @classmethod
+    def build(cls, texts, ids, n_components=LSA_COMPONENTS, max_features=LSA_MAX_FEATURES, random_state=42):
+        """Fits TF-IDF and a truncated SVD on the corpus and projects every resume."""
+        vectorizer = TfidfVectorizer(
+            stop_words='english', sublinear_tf=True, max_features=max_features, dtype=np.float32
+        )
+        tfidf = vectorizer.fit_transform(texts)
+        # The rank is bounded by the corpus size and the vocabulary
+        n_components = max(1, min(n_components, tfidf.shape[0] - 1, tfidf.shape[1] - 1))
+        svd = TruncatedSVD(n_components=n_components, random_state=random_state)
+        vectors = svd.fit_transform(tfidf)
+        return cls(
+            vectorizer,
+            np.ascontiguousarray(svd.components_, dtype=np.float32),
+            np.ascontiguousarray(_unit_rows(vectors), dtype=np.float32),
+            ids,
+            float(svd.explained_variance_ratio_.sum()),
+        )
+
+    def save(self, path):
+        """Writes the index next to `path` and swaps it in with a single rename."""
+        parent = os.path.dirname(os.path.abspath(path))
+        os.makedirs(parent, exist_ok=True)
+        tmp_dir = tempfile.mkdtemp(prefix=".lsa_", dir=parent)
+        with open(os.path.join(tmp_dir, VECTORIZER_FILE), "wb") as f:
+            pickle.dump(self.vectorizer, f)
+        np.save(os.path.join(tmp_dir, COMPONENTS_FILE), np.ascontiguousarray(self.components, dtype=np.float32))
+        np.save(os.path.join(tmp_dir, VECTORS_FILE), np.ascontiguousarray(self.vectors, dtype=np.float32))
+        with open(os.path.join(tmp_dir, META_FILE), "w", encoding="utf-8") as f:
+            json.dump({"ids": self.ids, "explained_variance": self.explained_variance}, f)
+
+        old_dir = None
+        if os.path.exists(path):
+            old_dir = tmp_dir + ".old"
+            os.rename(path, old_dir)
+        os.rename(tmp_dir, path)
+        if old_dir:
+            shutil.rmtree(old_dir, ignore_errors=True)
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """Loads an index; the dense arrays are memory-mapped unless mmap=False."""
+        with open(os.path.join(path, VECTORIZER_FILE), "rb") as f:
+            vectorizer = pickle.load(f)
+        with open(os.path.join(path, META_FILE), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        mode = "r" if mmap else None
+        components = np.load(os.path.join(path, COMPONENTS_FILE), mmap_mode=mode)
+        vectors = np.load(os.path.join(path, VECTORS_FILE), mmap_mode=mode)
+        return cls(vectorizer, components, vectors, meta["ids"], meta.get("explained_variance"))
+
+    def embed(self, texts):
+        """Projects texts into the LSA space (unit-length float32 rows)."""
+        tfidf = self.vectorizer.transform(texts)
+        return _unit_rows(np.asarray(tfidf @ self.components.T, dtype=np.float32))
+
+    def vectors_for(self, texts, ids):
+        """Returns one row per text, reusing stored rows for ids already in the index."""
+        rows = np.empty((len(texts), self.n_components), dtype=np.float32)
+        missing = []
+        for i, h in enumerate(ids):
+            if h in self.positions:
+                rows[i] = self.vectors[self.positions[h]]
+            else:
+                missing.append(i)
+        if missing:
+            rows[missing] = self.embed([texts[i] for i in missing])
+        return rows
+
+    def scores(self, job_desc):
+        """Cosine similarity of the job description against every indexed resume: one matrix-vector product."""
+        return self.vectors @ self.embed([job_desc])[0]
+
+    def similarities(self, job_desc, vectors):
+        """Cosine similarity of the job description against the given rows."""
+        return vectors @ self.embed([job_desc])[0]
+
+    def search(self, job_desc, k):
+        """Returns (total_matches, [(content_hash, score), ...]) for the k best resumes."""
+        scores = self.scores(job_desc)
+        # Dense scores are rarely exactly zero: only positively correlated resumes count as matches
+        candidates = np.flatnonzero(scores > 0)
+        best = top_k(candidates, scores, k)
+        return len(candidates), [(self.ids[i], float(scores[i])) for i in best]
+
+
+def load_lsa_index(path):
+    """Loads the index at `path`, or returns None when it has not been built yet."""
+    if not os.path.exists(os.path.join(path, META_FILE)):
+        return None
+    try:
+        return LsaIndex.load(path)
+    except Exception as e:
+        print(f"Error loading LSA index from {path}: {e}")
+        return None
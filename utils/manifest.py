@@ -0,0 +1,77 @@
+import os
+import json
+import hashlib
+import tempfile
+
+# Change manifest for incremental folder processing: one JSON file per folder with
+#   {filename: {"size": ..., "mtime_ns": ..., "sha256": ...}}
+# A file whose size and mtime are unchanged is not read again; one whose stat
+# changed is hashed, and only counts as changed if its content did.
+MANIFEST_VERSION = 1
+HASH_CHUNK = 1 << 20
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class Manifest:
+    """The per-file size, mtime and content hash recorded by the last run over a folder."""
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        self.exists = False
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == MANIFEST_VERSION:
+                self.entries = data["files"]
+                self.exists = True
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Ignoring unreadable manifest {path}: {e}")
+
+    def scan(self, folder, filenames, full=False):
+        """Returns (changed, deleted): new or modified files among `filenames`, and files gone since the last run.
+
+        Each changed file maps to its new entry; call record() once it has been processed.
+        full=True reports every file as changed, while deletions still come from the last run.
+        """
+        present = set(filenames)
+        deleted = sorted(name for name in self.entries if name not in present)
+        if full:
+            self.entries = {}
+        changed = {}
+        for filename in filenames:
+            stat = os.stat(os.path.join(folder, filename))
+            old = self.entries.get(filename)
+            if old and old["size"] == stat.st_size and old["mtime_ns"] == stat.st_mtime_ns:
+                continue
+            entry = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns,
+                     "sha256": file_sha256(os.path.join(folder, filename))}
+            if old and old["sha256"] == entry["sha256"]:
+                # Touched or copied over with the same content: remember the new stat only
+                self.entries[filename] = entry
+                continue
+            changed[filename] = entry
+        return changed, deleted
+
+    def record(self, filename, entry):
+        self.entries[filename] = entry
+
+    def forget(self, filename):
+        self.entries.pop(filename, None)
+
+    def save(self):
+        directory = os.path.dirname(self.path) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix=".manifest_", dir=directory)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"version": MANIFEST_VERSION, "files": self.entries}, f, sort_keys=True)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,216 @@
+import os
+import json
+import time
+import bisect
+import tempfile
+import threading
+import contextvars
+from contextlib import contextmanager
+
+# Minimal Prometheus-style counters and histograms.
+#
+# Recording is a lock, a bisect and a few additions; nothing is formatted until
+# /metrics is scraped. Each gunicorn worker keeps its own values. With
+# METRICS_DIR set, every worker also writes a snapshot there every
+# METRICS_FLUSH_SECONDS, and a scrape of any worker reports the sum over all of them.
+METRICS_DIR = os.environ.get("METRICS_DIR")
+METRICS_FLUSH_SECONDS = float(os.environ.get("METRICS_FLUSH_SECONDS", "5"))
+
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+_registry = []
+
+
+class Counter:
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def inc(self, amount=1, **labels):
+        key = tuple(str(labels.get(n, "")) for n in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def snapshot(self):
+        with self._lock:
+            return {"type": "counter", "help": self.documentation, "labelnames": self.labelnames,
+                    "values": [[list(k), v] for k, v in self._values.items()]}
+
+
+class Histogram:
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._values = {}  # labels -> [count per bucket..., +Inf count, sum]
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels.get(n, "")) for n in self.labelnames)
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            values = self._values.get(key)
+            if values is None:
+                values = self._values[key] = [0] * (len(self.buckets) + 2)
+            values[i] += 1
+            values[-1] += value
+
+    def snapshot(self):
+        with self._lock:
+            return {"type": "histogram", "help": self.documentation, "labelnames": self.labelnames,
+                    "buckets": self.buckets, "values": [[list(k), list(v)] for k, v in self._values.items()]}
+
+
+def snapshot():
+    return {metric.name: metric.snapshot() for metric in _registry}
+
+
+def _merge(total, other):
+    for name, metric in other.items():
+        if name not in total:
+            total[name] = {**metric, "values": []}
+        merged = {tuple(k): v for k, v in total[name]["values"]}
+        for labels, value in metric["values"]:
+            key = tuple(labels)
+            if key not in merged:
+                merged[key] = value
+            elif isinstance(value, list):
+                merged[key] = [a + b for a, b in zip(merged[key], value)]
+            else:
+                merged[key] += value
+        total[name]["values"] = [[list(k), v] for k, v in merged.items()]
+    return total
+
+
+def _label_text(labelnames, labels, extra=()):
+    pairs = list(zip(labelnames, labels)) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n") for _, v in pairs)
+    return "{" + ",".join(f'{n}="{v}"' for (n, _), v in zip(pairs, escaped)) + "}"
+
+
+def render(metrics):
+    """Prometheus text exposition format (version 0.0.4)."""
+    lines = []
+    for name, metric in sorted(metrics.items()):
+        lines.append(f"# HELP {name} {metric['help']}")
+        lines.append(f"# TYPE {name} {metric['type']}")
+        for labels, value in sorted(metric["values"]):
+            if metric["type"] == "counter":
+                lines.append(f"{name}{_label_text(metric['labelnames'], labels)} {value}")
+                continue
+            cumulative = 0
+            for bound, count in zip(list(metric["buckets"]) + ["+Inf"], value[:-1]):
+                cumulative += count
+                lines.append(f"{name}_bucket{_label_text(metric['labelnames'], labels, [('le', bound)])} {cumulative}")
+            lines.append(f"{name}_sum{_label_text(metric['labelnames'], labels)} {value[-1]}")
+            lines.append(f"{name}_count{_label_text(metric['labelnames'], labels)} {cumulative}")
+    return "\n".join(lines) + "\n"
+
+
+class SnapshotExporter:
+    """Periodically writes this process's snapshot to METRICS_DIR/<pid>.json."""
+
+    def __init__(self, directory, interval):
+        self.directory = directory
+        self.interval = interval
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def ensure_started(self):
+        # One writer thread per process, started after gunicorn forks the worker
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid != os.getpid():
+                os.makedirs(self.directory, exist_ok=True)
+                threading.Thread(target=self._run, name="metrics-exporter", daemon=True).start()
+                self._pid = os.getpid()
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            self.write()
+
+    def write(self):
+        fd, tmp_path = tempfile.mkstemp(prefix=".metrics_", dir=self.directory)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(snapshot(), f)
+        os.replace(tmp_path, os.path.join(self.directory, f"{os.getpid()}.json"))
+
+    def collect(self):
+        """This process's live values plus the last snapshot of every other process."""
+        total = _merge({}, snapshot())
+        own = f"{os.getpid()}.json"
+        for name in os.listdir(self.directory):
+            if not name.endswith(".json") or name == own:
+                continue
+            try:
+                with open(os.path.join(self.directory, name), "r", encoding="utf-8") as f:
+                    _merge(total, json.load(f))
+            except (OSError, ValueError):
+                continue
+        return total
+
+
+_exporter = SnapshotExporter(METRICS_DIR, METRICS_FLUSH_SECONDS) if METRICS_DIR else None
+
+
+def start_exporter():
+    if _exporter is not None:
+        _exporter.ensure_started()
+
+
+def exposition():
+    """The /metrics response body."""
+    return render(_exporter.collect() if _exporter is not None else snapshot())
+
+
+# --- PER-REQUEST STAGE TIMING ---
+
+STAGE_SECONDS = Histogram(
+    "resume_stage_duration_seconds", "Time spent in each processing stage.", ["stage"]
+)
+
+# (stage, seconds) of the current request; None outside a request (e.g. background threads)
+_request_timings = contextvars.ContextVar("request_timings", default=None)
+
+
+def begin_request():
+    _request_timings.set([])
+
+
+def request_timings():
+    return _request_timings.get() or []
+
+
+@contextmanager
+def stage(name):
+    """Times a block into STAGE_SECONDS and into the current request's Server-Timing entries."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_SECONDS.observe(elapsed, stage=name)
+        timings = _request_timings.get()
+        if timings is not None:
+            timings.append((name, elapsed))
+
+
+def server_timing(timings, total=None):
+    """Server-Timing header value; repeated stages are summed."""
+    durations = {}
+    for name, elapsed in timings:
+        durations[name] = durations.get(name, 0.0) + elapsed
+    if total is not None:
+        durations["total"] = total
+    return ", ".join(f"{name};dur={elapsed * 1000:.1f}" for name, elapsed in durations.items())
@@ -0,0 +1,165 @@
+import os
+import json
+import uuid
+import shutil
+import tempfile
+import threading
+from collections import namedtuple
+from datetime import datetime, timezone
+
+from utils.model_store import save_model, load_model, model_fingerprint, COMPACT_SUFFIX
+
+# Registry layout:
+#   models/<version>/model.joblib   compact, memory-mappable artifact
+#   models/<version>/metadata.json  labels, training size, metrics, ...
+#   models/LATEST                   name of the version to serve
+REGISTRY_DIR = os.environ.get("MODEL_REGISTRY_DIR", "models")
+MODEL_FILE = "model" + COMPACT_SUFFIX
+METADATA_FILE = "metadata.json"
+LATEST_FILE = "LATEST"
+
+# What the webapp serves: `model_id` identifies the feature space (see pipeline/build_index.py)
+ServedModel = namedtuple("ServedModel", ["model", "version", "model_id", "metadata"])
+
+
+class ModelRegistry:
+    """Directory of immutable model versions plus a pointer to the one to serve."""
+
+    def __init__(self, root=REGISTRY_DIR):
+        self.root = root
+
+    def version_dir(self, version):
+        return os.path.join(self.root, version)
+
+    def publish(self, model, metadata):
+        """Writes a new version and makes it the latest; returns the version name."""
+        os.makedirs(self.root, exist_ok=True)
+        created_at = datetime.now(timezone.utc)
+        version = created_at.strftime("%Y%m%d-%H%M%S") + "-" + uuid.uuid4().hex[:6]
+
+        # Fully write the version before it becomes visible under its final name
+        tmp_dir = tempfile.mkdtemp(prefix=".publish_", dir=self.root)
+        save_model(model, os.path.join(tmp_dir, MODEL_FILE))
+        with open(os.path.join(tmp_dir, METADATA_FILE), "w", encoding="utf-8") as f:
+            json.dump({**metadata, "version": version, "created_at": created_at.isoformat()}, f, indent=2)
+        os.rename(tmp_dir, self.version_dir(version))
+
+        self._set_latest(version)
+        return version
+
+    def _set_latest(self, version):
+        tmp_path = os.path.join(self.root, f".{LATEST_FILE}.{uuid.uuid4().hex}")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(version)
+        os.replace(tmp_path, os.path.join(self.root, LATEST_FILE))
+
+    def rollback(self, version):
+        """Points LATEST back at an existing version."""
+        if not os.path.isdir(self.version_dir(version)):
+            raise ValueError(f"Unknown model version: {version}")
+        self._set_latest(version)
+
+    def latest_version(self):
+        try:
+            with open(os.path.join(self.root, LATEST_FILE), "r", encoding="utf-8") as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def versions(self):
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(
+            name for name in os.listdir(self.root)
+            if os.path.isfile(os.path.join(self.root, name, METADATA_FILE))
+        )
+
+    def metadata(self, version):
+        with open(os.path.join(self.version_dir(version), METADATA_FILE), "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def load(self, version):
+        """Returns the ServedModel for a version."""
+        model = load_model(os.path.join(self.version_dir(version), MODEL_FILE))
+        return ServedModel(model, version, version, self.metadata(version))
+
+    def prune(self, keep=5):
+        """Deletes all but the `keep` newest versions (never the latest one)."""
+        latest = self.latest_version()
+        for version in self.versions()[:-keep]:
+            if version != latest:
+                shutil.rmtree(self.version_dir(version), ignore_errors=True)
+
+
+def load_legacy_model(path):
+    """Wraps a single model file (model.pkl / model.joblib) as a ServedModel."""
+    fingerprint = model_fingerprint(path)
+    return ServedModel(load_model(path), f"{os.path.basename(path)}@{fingerprint[:12]}", fingerprint, {})
+
+
+def load_serving_model(fallback_path, registry=None):
+    """The model the webapp serves: the registry's latest version, else fallback_path (None if neither exists)."""
+    registry = registry or ModelRegistry()
+    version = registry.latest_version()
+    if version is not None:
+        return registry.load(version)
+    if fallback_path and os.path.exists(fallback_path):
+        return load_legacy_model(fallback_path)
+    return None
+
+
+class LiveModel:
+    """Serves the registry's latest version and hot-swaps new ones.
+
+    A background thread polls LATEST every `poll_interval` seconds, loads a
+    new version off the request path and then replaces the served model
+    with a single reference assignment. Requests call `current()` once and
+    keep that snapshot, so in-flight work finishes on the model it started
+    with. Falls back to `fallback_path` while the registry is empty.
+    """
+
+    def __init__(self, registry, poll_interval=30, fallback_path=None):
+        self.registry = registry
+        self.poll_interval = poll_interval
+        self.fallback_path = fallback_path
+        self._current = None
+        self._poller_pid = None
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self.refresh()
+
+    def current(self):
+        """Returns the ServedModel to use for one request (None if no model is available)."""
+        self._ensure_poller()
+        return self._current
+
+    def refresh(self):
+        """Loads the latest version if it differs from the one being served."""
+        version = self.registry.latest_version()
+        current = self._current
+        try:
+            if version is not None:
+                if current is None or current.version != version:
+                    self._current = self.registry.load(version)
+                    print(f"Serving model version {version}")
+            elif current is None and self.fallback_path and os.path.exists(self.fallback_path):
+                self._current = load_legacy_model(self.fallback_path)
+        except Exception as e:
+            # Keep serving the previous model if the new one cannot be loaded
+            print(f"Error loading model version {version}: {e}")
+
+    def _poll(self):
+        while not self._stopped.wait(self.poll_interval):
+            self.refresh()
+
+    def stop(self):
+        self._stopped.set()
+
+    def _ensure_poller(self):
+        # One poller per process, started after gunicorn has forked the worker
+        if self._poller_pid == os.getpid() or self.poll_interval <= 0:
+            return
+        with self._lock:
+            if self._poller_pid != os.getpid():
+                threading.Thread(target=self._poll, name="model-reloader", daemon=True).start()
+                self._poller_pid = os.getpid()
@@ -0,0 +1,190 @@
+import os
+import sys
+import copy
+import pickle
+import hashlib
+from bisect import bisect_left
+from collections.abc import Mapping
+import joblib
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.pipeline import Pipeline
+
+# Model artifacts ending in .joblib are stored uncompressed so that their numpy
+# arrays (vocabulary, IDF, coefficients) can be memory-mapped on load. Workers
+# that map the same file share those pages instead of each holding a copy.
+COMPACT_SUFFIX = ".joblib"
+
+
+class _SortedTerms:
+    """Sequence view of the i-th term's UTF-8 bytes, for bisect."""
+
+    def __init__(self, data, offsets):
+        self.data = data
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        return self.data[self.offsets[i]:self.offsets[i + 1]].tobytes()
+
+
+class CompactVocabulary(Mapping):
+    """Read-only term -> column mapping kept in three numpy arrays.
+
+    The terms are sorted by their UTF-8 bytes and concatenated into `data`;
+    term i is data[offsets[i]:offsets[i + 1]], so each term takes its own
+    length rather than that of the longest one. Lookups are a binary search.
+    Unlike a dict of Python str/int objects, the arrays are plain memory
+    blocks that can be memory-mapped and are never touched by reference
+    counting, so forked workers keep sharing them.
+    """
+
+    def __init__(self, data, offsets, columns):
+        self.data = data
+        self.offsets = offsets
+        self.columns = columns
+
+    @classmethod
+    def from_dict(cls, vocabulary):
+        encoded = sorted((term.encode("utf-8"), column) for term, column in vocabulary.items())
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(term) for term, _ in encoded], out=offsets[1:])
+        offset_type = np.int32 if offsets[-1] <= np.iinfo(np.int32).max else np.int64
+        data = np.frombuffer(b"".join(term for term, _ in encoded), dtype=np.uint8).copy()
+        columns = np.array([column for _, column in encoded], dtype=np.int32)
+        return cls(data, offsets.astype(offset_type), columns)
+
+    def __setstate__(self, state):
+        if "terms" in state:
+            # Artifacts written before the byte layout kept a fixed-width str array
+            terms = state.pop("terms").tolist()
+            state = vars(CompactVocabulary.from_dict(dict(zip(terms, state["columns"].tolist()))))
+        self.__dict__.update(state)
+
+    def _index(self, term):
+        key = term.encode("utf-8")
+        terms = _SortedTerms(self.data, self.offsets)
+        i = bisect_left(terms, key)
+        return i if i < len(terms) and terms[i] == key else -1
+
+    def __getitem__(self, term):
+        i = self._index(term)
+        if i < 0:
+            raise KeyError(term)
+        return int(self.columns[i])
+
+    def __iter__(self):
+        terms = _SortedTerms(self.data, self.offsets)
+        return (terms[i].decode("utf-8") for i in range(len(terms)))
+
+    def __len__(self):
+        return len(self.columns)
+
+    def lookup(self, tokens):
+        """Vectorized lookup: column of every in-vocabulary token (others are dropped)."""
+        if not tokens or not len(self.columns):
+            return np.empty(0, dtype=np.int32)
+        # Each distinct token is searched once; documents repeat most of theirs
+        found = {}
+        for token in set(tokens):
+            i = self._index(token)
+            if i >= 0:
+                found[token] = self.columns[i]
+        return np.fromiter((found[t] for t in tokens if t in found), dtype=np.int32)
+
+
+class CompactTfidfVectorizer(TfidfVectorizer):
+    """TfidfVectorizer whose fitted vocabulary is a CompactVocabulary."""
+
+    def _count_vocab(self, raw_documents, fixed_vocab):
+        if not fixed_vocab or not isinstance(self.vocabulary_, CompactVocabulary):
+            return super()._count_vocab(raw_documents, fixed_vocab)
+
+        analyze = self.build_analyzer()
+        indices, values, indptr = [], [], [0]
+        for doc in raw_documents:
+            columns, counts = np.unique(self.vocabulary_.lookup(analyze(doc)), return_counts=True)
+            indices.append(columns)
+            values.append(counts)
+            indptr.append(indptr[-1] + len(columns))
+
+        X = sparse.csr_matrix(
+            (
+                np.concatenate(values) if values else np.empty(0, dtype=np.intc),
+                np.concatenate(indices) if indices else np.empty(0, dtype=np.int32),
+                np.asarray(indptr, dtype=np.int64 if indptr[-1] > np.iinfo(np.int32).max else np.int32),
+            ),
+            shape=(len(indptr) - 1, len(self.vocabulary_)),
+            dtype=self.dtype,
+        )
+        return self.vocabulary_, X
+
+
+def compact_vectorizer(vectorizer):
+    """Copies a fitted TfidfVectorizer into a CompactTfidfVectorizer."""
+    compact = CompactTfidfVectorizer(**vectorizer.get_params())
+    compact.__dict__.update(vectorizer.__dict__)
+    compact.vocabulary_ = CompactVocabulary.from_dict(vectorizer.vocabulary_)
+    # Only needed for introspection and can be as large as the vocabulary itself
+    compact.__dict__.pop("stop_words_", None)
+    return compact
+
+
+def compact_model(model):
+    """Returns the model with every fitted TfidfVectorizer replaced by its compact form."""
+    if isinstance(model, Pipeline):
+        compact = copy.copy(model)
+        compact.steps = [(name, compact_model(step)) for name, step in model.steps]
+        return compact
+    if isinstance(model, TfidfVectorizer) and not isinstance(model, CompactTfidfVectorizer):
+        return compact_vectorizer(model)
+    return model
+
+
+def default_model_path():
+    """MODEL_PATH if set, else the compact artifact when present, else the legacy pickle."""
+    if os.environ.get("MODEL_PATH"):
+        return os.environ["MODEL_PATH"]
+    return "model" + COMPACT_SUFFIX if os.path.exists("model" + COMPACT_SUFFIX) else "model.pkl"
+
+
+def save_model(model, path):
+    """Saves a model; .joblib paths get the compact, memory-mappable format."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    if path.endswith(COMPACT_SUFFIX):
+        joblib.dump(compact_model(model), path)
+    else:
+        with open(path, "wb") as f:
+            pickle.dump(model, f)
+
+
+def load_model(path):
+    """Loads a model; numpy arrays of .joblib artifacts are memory-mapped read-only."""
+    if path.endswith(COMPACT_SUFFIX):
+        return joblib.load(path, mmap_mode="r")
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+def model_fingerprint(path):
+    """SHA-256 of the artifact file; identifies the model's feature space."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+if __name__ == "__main__":
+    # Convert a pickled model: python utils/model_store.py model.pkl model.joblib
+    # (import through the package so pickled classes resolve to utils.model_store)
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from utils.model_store import save_model, load_model
+
+    source = sys.argv[1] if len(sys.argv) > 1 else "model.pkl"
+    target = sys.argv[2] if len(sys.argv) > 2 else os.path.splitext(source)[0] + COMPACT_SUFFIX
+    save_model(load_model(source), target)
+    print(f"Saved compact model to {target}")
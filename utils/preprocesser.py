@@ -1,19 +1,18 @@
 import os
+import sys
 from datetime import datetime
 from cachelib import MongoDbCache
-from pymongo import MongoClient
-from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.linear_model import LogisticRegression
 from sklearn.pipeline import make_pipeline
-from sklearn.model_selection import train_test_split
 from sklearn.metrics import classification_report
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.db import get_collection
+from utils.feature_cache import FeatureCache, vectorize_split, tune_classifier
+
 # MongoDB Setup
 def connect_to_mongo():
-    client = MongoClient("mongodb://localhost:27017/")  # or replace with Atlas URL
-    db = client["resume_screening"]
-    collection = db["predictions"]
-    return collection
+    return get_collection("predictions")  # MONGO_URI env var selects the server (e.g. Atlas)
 
 # Store prediction in MongoDB
 def save_prediction_to_mongo(collection, filename, category):
@@ -33,7 +32,7 @@ def load_labeled_resumes(folder):
     texts = []
     labels = []
     filenames = []
-    for fname in os.listdir(folder):
+    for fname in sorted(os.listdir(folder)):  # stable order keeps the feature cache key stable
         if fname.endswith(".txt"):
             path = os.path.join(folder, fname)
             with open(path, "r", encoding="utf-8") as f:
@@ -42,18 +41,16 @@ def load_labeled_resumes(folder):
                 filenames.append(fname)
     return texts, labels, filenames
 
-# Train and evaluate model
-def train_and_evaluate(folder):
+# Train and evaluate model (features are cached per corpus; search=True tunes on n_jobs cores)
+def train_and_evaluate(folder, search=False, n_jobs=-1, cache=None):
     texts, labels, _ = load_labeled_resumes(folder)
-    X_train, X_test, y_train, y_test = train_test_split(
-        texts, labels, test_size=0.3, random_state=42
-    )
-    model = make_pipeline(
-        TfidfVectorizer(stop_words='english'),
-        LogisticRegression(max_iter=1000)
-    )
-    model.fit(X_train, y_train)
-    y_pred = model.predict(X_test)
+    vectorizer, X_train, X_test, y_train, y_test = vectorize_split(texts, labels, cache or FeatureCache())
+    if search:
+        classifier, _ = tune_classifier(X_train, y_train, n_jobs=n_jobs)
+    else:
+        classifier = LogisticRegression(max_iter=1000).fit(X_train, y_train)
+    model = make_pipeline(vectorizer, classifier)
+    y_pred = classifier.predict(X_test)
     print("=== Classification Report ===")
     print(classification_report(y_test, y_pred))
     return model
@@ -1,43 +1,148 @@
-import pandas as pd
-from pymongo import MongoClient
-import pickle
-
-# Connect to MongoDB and fetch resumes
-client = MongoClient("mongodb://localhost:27017/")
-db = client["resume_screening"]
-collection = db["predictions"]
-
-# Fetch resumes and categories
-docs = list(collection.find({"resume": {"$exists": True, "$ne": ""}}))
-if not docs:
-    print("No resumes found in the database.")
-    exit()
-
-# Build DataFrame
-df = pd.DataFrame([{"resume": doc["resume"], "category": doc.get("category", ""), "filename": doc.get("filename", "")} for doc in docs])
-
-# Load trained model
-with open("model.pkl", "rb") as f:
-    model = pickle.load(f)
-
-# Get the resume texts (as a list)
-resume_texts = df["resume"].astype(str).tolist()
-
-# Predict categories and get confidence scores
-predictions = model.predict(resume_texts)
-if hasattr(model, "predict_proba"):
-    proba = model.predict_proba(resume_texts)
-    confidences = proba.max(axis=1)
-else:
-    confidences = [1.0] * len(predictions)  # fallback if model doesn't support predict_proba
-
-# Add predictions and confidence to DataFrame and sort
-df["predicted_category"] = predictions
-df["confidence"] = confidences
-df_sorted = df.sort_values(by="confidence", ascending=False).reset_index(drop=True)
-df_sorted["rank"] = df_sorted.index + 1  # Rank starts at 1
-
-# Display top matches with rank
-print(df_sorted[["rank", "filename", "predicted_category", "confidence"]].head(10))
-
-client.close()
\ No newline at end of file
+import os
+import sys
+import heapq
+import argparse
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from pymongo import UpdateOne
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.db import get_collection
+from utils.model_store import default_model_path
+from utils.model_registry import load_serving_model
+from utils.scoring import split_model, classify
+
+# Re-scores the labeled resumes in the predictions collection with the serving model:
+#   python utils/rank_resumes.py [--chunk-size 1000] [--workers 4] [--top 10] [--restart]
+# The collection is walked in _id order, one chunk at a time, and the results are
+# written back with bulk_write. Progress is checkpointed per model version, so an
+# interrupted run picks up after the last chunk it wrote.
+CHUNK_SIZE = 1000
+TOP_K = 10
+CHECKPOINTS = "rescoring_checkpoints"
+
+QUERY = {"resume": {"$exists": True, "$ne": ""}}
+PROJECTION = {"resume": 1, "filename": 1}
+
+# Set in the parent before the pool forks, so workers inherit it instead of unpickling it per chunk
+_model = None
+
+
+def score_chunk(texts):
+    """(labels, confidences) for one chunk of resume texts."""
+    featurizer, classifier = split_model(_model)
+    features = featurizer.transform(texts) if featurizer is not None else texts
+    labels, confidences = classify(classifier, features)
+    return [str(label) for label in labels], [float(c) for c in confidences]
+
+
+def iter_chunks(collection, after_id, chunk_size):
+    """Yields lists of {_id, resume, filename} documents in _id order, starting after after_id."""
+    query = dict(QUERY)
+    if after_id is not None:
+        query["_id"] = {"$gt": after_id}
+    chunk = []
+    for doc in collection.find(query, PROJECTION).sort("_id", 1).batch_size(chunk_size):
+        chunk.append(doc)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def scored_chunks(chunks, workers):
+    """Yields (chunk, (labels, confidences)) in input order, scoring up to 2 * workers chunks ahead."""
+    if workers <= 1:
+        for chunk in chunks:
+            yield chunk, score_chunk([doc["resume"] for doc in chunk])
+        return
+
+    context = multiprocessing.get_context("fork")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+        pending = deque()
+        for chunk in chunks:
+            pending.append((chunk, executor.submit(score_chunk, [doc["resume"] for doc in chunk])))
+            # Bounded look-ahead: memory holds a few chunks, never the whole corpus
+            if len(pending) >= 2 * workers:
+                done_chunk, future = pending.popleft()
+                yield done_chunk, future.result()
+        while pending:
+            done_chunk, future = pending.popleft()
+            yield done_chunk, future.result()
+
+
+def rescore(chunk_size=CHUNK_SIZE, workers=0, top=TOP_K, restart=False, model_path=None):
+    global _model
+    served = load_serving_model(model_path or default_model_path())
+    if served is None:
+        print("No model found: publish one with pipeline/train_model.py or place model.pkl here.")
+        return []
+    _model = served.model
+
+    collection = get_collection("predictions")
+    checkpoints = get_collection(CHECKPOINTS)
+    checkpoint = None if restart else checkpoints.find_one({"_id": served.version})
+    if checkpoint and checkpoint.get("completed"):
+        print(f"Already re-scored with model {served.version}; use --restart to run again.")
+        return []
+    after_id = checkpoint["last_id"] if checkpoint else None
+    scored = checkpoint["scored"] if checkpoint else 0
+    if after_id is not None:
+        print(f"Resuming model {served.version} after {scored} resumes")
+
+    top_heap = []  # (confidence, seq, filename, category), smallest on top
+    seq = 0
+    for chunk, (labels, confidences) in scored_chunks(iter_chunks(collection, after_id, chunk_size), workers):
+        now = datetime.now(timezone.utc)
+        collection.bulk_write([
+            UpdateOne({"_id": doc["_id"]}, {"$set": {
+                "predicted_category": label,
+                "confidence": confidence,
+                "model_version": served.version,
+                "scored_at": now,
+            }})
+            for doc, label, confidence in zip(chunk, labels, confidences)
+        ], ordered=False)
+
+        for doc, label, confidence in zip(chunk, labels, confidences):
+            entry = (confidence, seq, doc.get("filename", ""), label)
+            seq += 1
+            if len(top_heap) < top:
+                heapq.heappush(top_heap, entry)
+            elif entry > top_heap[0]:
+                heapq.heapreplace(top_heap, entry)
+
+        # Only after the chunk's writes succeeded: a crash re-scores at most one chunk
+        scored += len(chunk)
+        checkpoints.update_one(
+            {"_id": served.version},
+            {"$set": {"last_id": chunk[-1]["_id"], "scored": scored, "updated_at": now}},
+            upsert=True,
+        )
+        print(f"Scored {scored} resumes")
+
+    checkpoints.update_one({"_id": served.version}, {"$set": {"completed": True}}, upsert=True)
+    if not scored:
+        print("No resumes found in the database.")
+        return []
+
+    # Top matches of this run (a resumed run only ranks the resumes it scored itself)
+    ranked = sorted(top_heap, reverse=True)
+    print(f"{'rank':>4}  {'filename':<40} {'predicted_category':<28} confidence")
+    for rank, (confidence, _, filename, label) in enumerate(ranked, start=1):
+        print(f"{rank:>4}  {filename:<40} {label:<28} {confidence:.4f}")
+    return ranked
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Re-score the predictions collection with the serving model.")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--workers", type=int, default=0, help="scoring processes (0: score in this process)")
+    parser.add_argument("--top", type=int, default=TOP_K, help="number of top matches to print")
+    parser.add_argument("--restart", action="store_true", help="ignore the checkpoint and re-score everything")
+    parser.add_argument("--model-path", help="model file used when the registry is empty")
+    args = parser.parse_args()
+    rescore(args.chunk_size, args.workers, args.top, args.restart, args.model_path)
@@ -0,0 +1,118 @@
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from pymongo import UpdateOne
+from pymongo.errors import PyMongoError
+
+# Two-tier cache for ranking results: an LRU/TTL dict per process, plus an optional
+# MongoDB collection shared by every gunicorn worker (expired documents are removed by
+# a TTL index on expires_at, see utils/db.py). Values must be BSON-serializable.
+
+
+def job_description_hash(job_desc):
+    """Case- and whitespace-insensitive hash of a job description (the vectorizers lowercase anyway)."""
+    normalized = " ".join((job_desc or "").lower().split())
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def cache_key(*parts):
+    return hashlib.sha256("\0".join(str(p) for p in parts).encode("utf-8")).hexdigest()
+
+
+class TTLCache:
+    """Thread-safe LRU mapping whose entries also expire `ttl` seconds after being stored."""
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()  # key -> (expires, value)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return entry[1]
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+
+class MongoCache:
+    """Cache entries shared between processes; failures are reported and treated as misses."""
+
+    def __init__(self, collection, ttl):
+        self.collection = collection
+        self.ttl = ttl
+
+    def get_many(self, keys):
+        try:
+            docs = self.collection.find(
+                {"_id": {"$in": list(keys)}, "expires_at": {"$gt": datetime.now(timezone.utc)}},
+                {"value": 1}
+            )
+            return {doc["_id"]: doc["value"] for doc in docs}
+        except PyMongoError as e:
+            print(f"Shared cache lookup failed: {e}")
+            return {}
+
+    def put_many(self, items):
+        if not items:
+            return
+        expires_at = datetime.now(timezone.utc) + timedelta(seconds=self.ttl)
+        try:
+            # One unordered round trip; the TTL index removes the documents once they expire
+            self.collection.bulk_write([
+                UpdateOne({"_id": key}, {"$set": {"value": value, "expires_at": expires_at}}, upsert=True)
+                for key, value in items.items()
+            ], ordered=False)
+        except PyMongoError as e:
+            print(f"Shared cache write failed: {e}")
+
+
+class TieredCache:
+    """Looks keys up in the process-local tier first, then in the shared tier (if any)."""
+
+    def __init__(self, local, shared=None):
+        self.local = local
+        self.shared = shared
+
+    def get_many(self, keys):
+        """Returns (found {key: value}, number of keys served by the shared tier)."""
+        found = {}
+        for key in keys:
+            value = self.local.get(key)
+            if value is not None:
+                found[key] = value
+        missing = [key for key in keys if key not in found]
+        shared_hits = 0
+        if missing and self.shared is not None:
+            remote = self.shared.get_many(missing)
+            for key, value in remote.items():
+                self.local.put(key, value)
+            found.update(remote)
+            shared_hits = len(remote)
+        return found, shared_hits
+
+    def get(self, key):
+        return self.get_many([key])[0].get(key)
+
+    def put_many(self, items):
+        for key, value in items.items():
+            self.local.put(key, value)
+        if self.shared is not None:
+            self.shared.put_many(items)
+
+    def put(self, key, value):
+        self.put_many({key: value})
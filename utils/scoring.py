@@ -0,0 +1,40 @@
+import numpy as np
+from scipy import sparse
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import normalize
+
+
+def split_model(model):
+    """Splits a fitted text pipeline into (featurizer, classifier).
+
+    The featurizer is everything before the final step (e.g. the TF-IDF
+    vectorizer), so callers can vectorize once and reuse the matrix.
+    Returns (None, model) for models that are not a multi-step Pipeline.
+    """
+    if isinstance(model, Pipeline) and len(model.steps) > 1:
+        return model[:-1], model[-1]
+    return None, model
+
+
+def classify(classifier, features):
+    """Returns (labels, confidences) from an already vectorized feature matrix."""
+    if hasattr(classifier, "predict_proba"):
+        proba = classifier.predict_proba(features)
+        return classifier.classes_[proba.argmax(axis=1)], proba.max(axis=1)
+    if hasattr(classifier, "decision_function"):
+        scores = classifier.decision_function(features)
+        if scores.ndim == 1:
+            # Binary case: one margin per row, positive means classes_[1]
+            return classifier.classes_[(scores > 0).astype(int)], np.ones(len(scores))
+        return classifier.classes_[scores.argmax(axis=1)], np.ones(scores.shape[0])
+    # Raw texts for a model that vectorizes itself, or a matrix: size by the predictions
+    labels = classifier.predict(features)
+    return labels, np.ones(len(labels))
+
+
+def cosine_scores(features, query):
+    """Cosine similarity of each feature row against a single query row."""
+    features = normalize(features)
+    query = normalize(query)
+    sims = features @ query.T
+    return np.asarray(sims.todense() if sparse.issparse(sims) else sims).ravel()
@@ -0,0 +1,180 @@
+import os
+import re
+from collections import deque
+
+from utils.result_cache import TTLCache, job_description_hash
+from utils.text_normalizer import STOPWORDS
+
+# Explainable skill matching: which of a job description's required skills a resume mentions.
+#
+# The required skills are the dictionary skills found in the job description plus terms
+# mined from it (see mine_terms). They are compiled into an Aho-Corasick automaton over
+# tokens, so each resume is scanned in one linear pass however many skills are required,
+# and multi-word skills ("machine learning", "ci/cd") match as token sequences. Automata
+# are cached by job-description hash.
+
+# Lowercase tokens; keeps c++, c#, node.js, .net and python3 whole
+TOKEN = re.compile(r"[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9+#]+)*|(?<![a-z0-9])\.[a-z][a-z0-9]*")
+
+# Dictionary of known skills (comma-separated). Ambiguous one-letter or common-word skills
+# ("c", "r", "go") are left out; a job description that lists them still gets them as mined terms.
+SKILLS = frozenset(skill.strip() for skill in """
+python, java, javascript, typescript, c++, c#, golang, rust, ruby, php, scala, kotlin, swift, matlab, perl, bash,
+sql, nosql, mysql, postgresql, mongodb, redis, oracle, sqlite, cassandra, elasticsearch, kafka, spark, hadoop, hive,
+airflow, etl, django, flask, fastapi, celery, spring, spring boot, hibernate, maven, gradle, junit, pytest, jpa,
+react, angular, vue, node.js, express, jquery, bootstrap, html, css, sass, figma, photoshop, illustrator,
+wireframes, ux, ui, rest, graphql, microservices, grpc,
+docker, kubernetes, jenkins, terraform, ansible, aws, azure, gcp, linux, git, github, gitlab, ci/cd, devops,
+monitoring, prometheus, grafana, nginx,
+pandas, numpy, scipy, scikit-learn, tensorflow, pytorch, keras, machine learning, deep learning, nlp,
+computer vision, statistics, regression, data analysis, data visualization, tableau, power bi, excel,
+selenium, cucumber, jira, agile, scrum, kanban, qa, manual testing, test automation, test cases, regression testing,
+firewall, vpn, siem, penetration testing, network security, cisco, routing, switching, tcp/ip,
+autocad, revit, staad, site supervision, structural design, surveying, estimation, construction,
+crm, salesforce, negotiation, lead generation, forecasting, account management, business development,
+recruitment, onboarding, payroll, employee relations, talent acquisition, performance management, compliance
+""".split(",") if skill.strip())
+
+# Alternative spellings, reported under the canonical skill
+ALIASES = {
+    "js": "javascript", "postgres": "postgresql", "k8s": "kubernetes", "sklearn": "scikit-learn",
+    "ml": "machine learning", "nodejs": "node.js", "ci cd": "ci/cd", "springboot": "spring boot",
+    "powerbi": "power bi",
+}
+
+# Lists following these cues in a job description are mined as required terms
+CUES = re.compile(
+    r"(?:skills?|requirements?|required|must have|experience (?:with|in)|knowledge of|proficien(?:t|cy) (?:in|with)|"
+    r"familiar(?:ity)? with|stack|tools?|technologies)\s*:?\s*([^.;\n]*)"
+)
+# Job-ad wording that is not a skill, dropped from mined terms
+FILLER = frozenset("""
+ability able also apis years year experience plus strong good excellent solid knowledge skills skill understanding
+working hands degree preferred including etc familiarity proficiency required requirements tools using
+""".split())
+MAX_TERM_TOKENS = 3
+MATCHER_CACHE_SIZE = int(os.environ.get("SKILL_MATCHER_CACHE_SIZE", "256"))
+MATCHER_CACHE_TTL = int(os.environ.get("SKILL_MATCHER_CACHE_TTL", "3600"))
+
+
+def tokenize(text):
+    return TOKEN.findall(text.lower())
+
+
+class SkillMatcher:
+    """Aho-Corasick automaton over tokens; each pattern reports a canonical skill name and its length in tokens."""
+
+    def __init__(self, patterns):
+        # patterns: {surface form: canonical skill}
+        self.skills = sorted(set(patterns.values()))
+        self._goto = [{}]
+        self._out = [()]
+        for surface, skill in patterns.items():
+            tokens = tokenize(surface)
+            if not tokens:
+                continue
+            state = 0
+            for token in tokens:
+                nxt = self._goto[state].get(token)
+                if nxt is None:
+                    self._goto.append({})
+                    self._out.append(())
+                    nxt = self._goto[state][token] = len(self._goto) - 1
+                state = nxt
+            self._out[state] += ((skill, len(tokens)),)
+        self._alphabet = frozenset(token for edges in self._goto for token in edges)
+        self._fail = self._link()
+
+    def _link(self):
+        """Failure links by breadth-first search; outputs are merged along them."""
+        fail = [0] * len(self._goto)
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, nxt in self._goto[state].items():
+                queue.append(nxt)
+                f = fail[state]
+                while f and token not in self._goto[f]:
+                    f = fail[f]
+                fail[nxt] = self._goto[f].get(token, 0) if state else 0
+                self._out[nxt] += self._out[fail[nxt]]
+        return fail
+
+    def find(self, text):
+        """Yields (start, end, skill) token spans of every skill mention in text, overlapping ones included."""
+        goto, fail, out, alphabet = self._goto, self._fail, self._out, self._alphabet
+        state = 0
+        for i, token in enumerate(tokenize(text)):
+            if token not in alphabet:
+                state = 0
+                continue
+            while state and token not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(token, 0)
+            for skill, length in out[state]:
+                yield i + 1 - length, i + 1, skill
+
+    def scan(self, text):
+        """The set of skills mentioned in text, in one pass over its tokens."""
+        return {skill for _, _, skill in self.find(text)}
+
+    def match(self, text):
+        """{"matched": [...], "missing": [...], "coverage": share of the skills matched}."""
+        found = self.scan(text)
+        matched = [skill for skill in self.skills if skill in found]
+        missing = [skill for skill in self.skills if skill not in found]
+        coverage = len(matched) / len(self.skills) if self.skills else 0.0
+        return {"matched": matched, "missing": missing, "coverage": coverage}
+
+
+DICTIONARY = SkillMatcher({**{skill: skill for skill in SKILLS}, **ALIASES})
+
+
+def mine_terms(job_desc):
+    """Short terms listed after cue words ("skills:", "experience with", ...) that are not in the dictionary."""
+    terms = set()
+    for listing in CUES.findall(job_desc.lower()):
+        for item in re.split(r",|\band\b|\bor\b|[()•]", listing):
+            tokens = [
+                t for t in tokenize(item)
+                if t not in STOPWORDS and t not in FILLER and any(ch.isalpha() for ch in t)
+            ]
+            if 0 < len(tokens) <= MAX_TERM_TOKENS:
+                terms.add(" ".join(tokens))
+    return terms
+
+
+def dictionary_skills(job_desc):
+    """Dictionary skills of a job description. A mention inside a longer one ("spring" in
+    "spring boot") is part of that skill, not a second requirement."""
+    mentions = list(DICTIONARY.find(job_desc))
+    return {
+        skill for start, end, skill in mentions
+        if not any(s <= start and end <= e and e - s > end - start for s, e, _ in mentions)
+    }
+
+
+def compile_job_description(job_desc):
+    """Matcher for the skills a job description asks for: dictionary hits plus mined terms."""
+    patterns = {skill: skill for skill in dictionary_skills(job_desc)}
+    for alias, skill in ALIASES.items():
+        if skill in patterns:
+            patterns[alias] = skill
+    for term in mine_terms(job_desc):
+        # A mined term that contains a dictionary skill is already covered by it
+        if not DICTIONARY.scan(term):
+            patterns.setdefault(term, term)
+    return SkillMatcher(patterns)
+
+
+_matchers = TTLCache(MATCHER_CACHE_SIZE, MATCHER_CACHE_TTL)
+
+
+def matcher_for(job_desc):
+    """The compiled matcher of a job description, cached by its normalized hash."""
+    key = job_description_hash(job_desc)
+    matcher = _matchers.get(key)
+    if matcher is None:
+        matcher = compile_job_description(job_desc or "")
+        _matchers.put(key, matcher)
+    return matcher
@@ -0,0 +1,113 @@
+import re
+
+# Regex replacement for the NLTK cleaning in utils/extract_text.py:
+#     [t for t in word_tokenize(text.lower()) if t.isalpha() and t not in stopwords]
+#
+# Only purely alphabetic tokens survive that filter, so instead of producing every
+# Treebank token we turn everything word_tokenize splits on into whitespace and then
+# keep the whitespace-separated tokens that are letters, optionally followed by the
+# clitic or sentence-final period word_tokenize would have split off. No NLTK data
+# (punkt, stopwords corpus) is needed, so nothing is downloaded at import.
+#
+# Known differences from word_tokenize:
+# - A closing quote after a clitic ("team's'") is split off by word_tokenize only when a
+#   space follows it; at the end of the text or before other punctuation the word keeps a
+#   clitic, is not alphabetic and is dropped there, while it is kept here.
+# - Sentence ends are approximated by ABBREVIATIONS and single-letter initials instead of
+#   the punkt model, so a period after an unusual abbreviation can be treated differently.
+
+# NLTK's English stopword list, frozen
+STOPWORDS = frozenset("""
+i me my myself we our ours ourselves you you're you've you'll you'd your yours yourself
+yourselves he him his himself she she's her hers herself it it's its itself they them their
+theirs themselves what which who whom this that that'll these those am is are was were be
+been being have has had having do does did doing a an the and but if or because as until
+while of at by for with about against between into through during before after above below
+to from up down in out on off over under again further then once here there when where why
+how all any both each few more most other some such no nor not only own same so than too
+very s t can will just don don't should should've now d ll m o re ve y ain aren aren't
+couldn couldn't didn didn't doesn doesn't hadn hadn't hasn hasn't haven haven't isn isn't
+ma mightn mightn't mustn mustn't needn needn't shan shan't shouldn shouldn't wasn wasn't
+weren weren't won won't wouldn wouldn't he'd he'll i'd i'll i'm i've it'd it'll she'd
+she'll they'd they'll they're they've we'd we'll we're we've
+""".split())
+
+# Characters and sequences word_tokenize always splits off as separate tokens:
+# quotes, brackets, ;@#$%&?!*, dashes, "--", ellipses, and ":"/"," not followed by a
+# digit. A leading apostrophe is split too unless it starts a clitic ('s, 're, ...).
+SEPARATORS = re.compile(
+    r"[;@#$%&?!*\[\](){}<>\"«»“”‘’„`‒-―]"
+    r"|--|''|\.{2,}|[:,](?!\d)"
+    r"|(?<!\w)'(?!(?:re|ve|ll|m|t|s|d|n)\b)(?=\w)"
+)
+
+# word_tokenize pads ":"/"," before a non-digit as " \1 \2", consuming the next character,
+# so in a run like ",," or ":," the second one is not split off and stays glued to the
+# word after it (",java" is then dropped as non-alphabetic). An even-length run directly
+# followed by a letter therefore loses that word; \x01 marks it as non-alphabetic. The
+# lookbehind sits after the first character so the scan can skip to ":"/"," directly.
+GLUED_RUN = re.compile(r"[:,](?<![:,][:,])[:,](?:[:,][:,])*(?=[^\W\d_])")
+GLUE = " \x01"
+
+# A token made of letters and the clitics word_tokenize splits off its end: at most one of
+# n't/'ll/'re/'ve, then one of 's/'m/'d/', then a closing quote ("isn't's'" keeps "is"),
+# then a final period
+TOKEN = re.compile(r"([^\W\d_]+?)(?:n't|'ll|'re|'ve)?(?:'s|'m|'d|')?'?(\.)?")
+
+# Inside a document punkt does not end a sentence after these, so their period
+# stays attached (and the token is not alphabetic); likewise after single-letter initials.
+ABBREVIATIONS = frozenset("""
+mr mrs ms dr prof jr sr st messrs rev gen col lt sgt capt gov sen rep inc co corp ltd
+vs jan feb mar apr jun jul aug sep sept oct nov dec
+""".split())
+
+# Words word_tokenize splits in two (MacIntyre contractions)
+CONTRACTIONS = {
+    "cannot": ("can", "not"),
+    "gimme": ("gim", "me"),
+    "gonna": ("gon", "na"),
+    "gotta": ("got", "ta"),
+    "lemme": ("lem", "me"),
+    "wanna": ("wan", "na"),
+}
+
+
+def _tokens(text):
+    words = text.split()
+    tokens = []
+    last = len(words) - 1
+    for i, word in enumerate(words):
+        if not word.isalpha():
+            # Slow path only for the few tokens that are not plain words
+            match = TOKEN.fullmatch(word)
+            if match is None:
+                continue
+            word, period = match.groups()
+            # The document's last period always ends a sentence
+            if period and (word in ABBREVIATIONS or len(word) == 1) and i != last:
+                continue
+        if word in CONTRACTIONS:
+            tokens.extend(t for t in CONTRACTIONS[word] if t not in STOPWORDS)
+        elif word not in STOPWORDS and word.isalpha():
+            tokens.append(word)
+    return tokens
+
+
+def normalize(text):
+    """Lowercases a document and returns its non-stopword alphabetic tokens, space-separated."""
+    if not text or not isinstance(text, str):
+        return ""
+    return " ".join(_tokens(SEPARATORS.sub(" ", GLUED_RUN.sub(GLUE, text.lower()))))
+
+
+def normalize_many(texts):
+    """normalize() for a batch of documents, with one pattern pass over all of them."""
+    texts = [t if isinstance(t, str) else "" for t in texts]
+    if not texts:
+        return []
+    if any("\0" in t for t in texts):
+        return [normalize(t) for t in texts]
+    # NUL-joined so the separator pass runs once; NUL is whitespace to neither pattern,
+    # hence documents are re-split before tokens are matched
+    joined = SEPARATORS.sub(" ", GLUED_RUN.sub(GLUE, "\0".join(texts).lower()))
+    return [" ".join(_tokens(doc)) for doc in joined.split("\0")]
@@ -0,0 +1,154 @@
+import os
+import json
+import heapq
+import pickle
+import shutil
+import tempfile
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+# Index directory layout:
+#   vectorizer.pkl                    fitted TfidfVectorizer (corpus-level IDF)
+#   data.npy, indices.npy, indptr.npy CSR components of the resume matrix
+#   postings_*.npy                    CSC components (term -> resumes inverted index)
+#   meta.json                         matrix shape, content hash of every row and, when the
+#                                     vectorizer is the serving model's featurizer, its model_id
+VECTORIZER_FILE = "vectorizer.pkl"
+META_FILE = "meta.json"
+CSR_PARTS = ("data", "indices", "indptr")
+POSTINGS_PREFIX = "postings_"
+
+
+class TfidfIndex:
+    """TF-IDF vectors of the stored resume corpus, addressed by content hash."""
+
+    def __init__(self, vectorizer, matrix, ids, postings=None, model_id=None):
+        self.vectorizer = vectorizer
+        self.matrix = matrix
+        self.ids = list(ids)
+        self.positions = {h: i for i, h in enumerate(self.ids)}
+        self._postings = postings
+        self.model_id = model_id
+
+    @property
+    def postings(self):
+        """Column-major copy of the matrix: each term's column lists the resumes containing it."""
+        if self._postings is None:
+            self._postings = self.matrix.tocsc()
+        return self._postings
+
+    def __len__(self):
+        return len(self.ids)
+
+    @classmethod
+    def build(cls, texts, ids, vectorizer=None, model_id=None):
+        """Vectorizes every resume with a fitted featurizer, or fits a new TF-IDF on the corpus."""
+        if vectorizer is None:
+            vectorizer = TfidfVectorizer(stop_words='english', dtype=np.float32)
+            matrix = vectorizer.fit_transform(texts)
+        else:
+            matrix = vectorizer.transform(texts)
+        return cls(vectorizer, sparse.csr_matrix(matrix), ids, model_id=model_id)
+
+    def save(self, path):
+        """Writes the index next to `path` and swaps it in with a single rename."""
+        parent = os.path.dirname(os.path.abspath(path))
+        os.makedirs(parent, exist_ok=True)
+        tmp_dir = tempfile.mkdtemp(prefix=".tfidf_", dir=parent)
+        with open(os.path.join(tmp_dir, VECTORIZER_FILE), "wb") as f:
+            pickle.dump(self.vectorizer, f)
+        for part in CSR_PARTS:
+            np.save(os.path.join(tmp_dir, part + ".npy"), getattr(self.matrix, part))
+            np.save(os.path.join(tmp_dir, POSTINGS_PREFIX + part + ".npy"), getattr(self.postings, part))
+        with open(os.path.join(tmp_dir, META_FILE), "w", encoding="utf-8") as f:
+            json.dump({"shape": list(self.matrix.shape), "ids": self.ids, "model_id": self.model_id}, f)
+
+        old_dir = None
+        if os.path.exists(path):
+            old_dir = tmp_dir + ".old"
+            os.rename(path, old_dir)
+        os.rename(tmp_dir, path)
+        if old_dir:
+            shutil.rmtree(old_dir, ignore_errors=True)
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """Loads an index; the CSR arrays are memory-mapped unless mmap=False."""
+        with open(os.path.join(path, VECTORIZER_FILE), "rb") as f:
+            vectorizer = pickle.load(f)
+        with open(os.path.join(path, META_FILE), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        mode = "r" if mmap else None
+        data, indices, indptr = (
+            np.load(os.path.join(path, part + ".npy"), mmap_mode=mode) for part in CSR_PARTS
+        )
+        shape = tuple(meta["shape"])
+        matrix = sparse.csr_matrix((data, indices, indptr), shape=shape, copy=False)
+
+        postings = None
+        if os.path.exists(os.path.join(path, POSTINGS_PREFIX + "data.npy")):
+            data, indices, indptr = (
+                np.load(os.path.join(path, POSTINGS_PREFIX + part + ".npy"), mmap_mode=mode)
+                for part in CSR_PARTS
+            )
+            postings = sparse.csc_matrix((data, indices, indptr), shape=shape, copy=False)
+        return cls(vectorizer, matrix, meta["ids"], postings, meta.get("model_id"))
+
+    def transform(self, texts):
+        """Vectorizes texts with the fixed corpus vocabulary and IDF (no refitting)."""
+        return self.vectorizer.transform(texts)
+
+    def vectors_for(self, texts, ids):
+        """Returns one row per text, reusing stored rows for ids already in the index."""
+        known = [i for i, h in enumerate(ids) if h in self.positions]
+        missing = [i for i, h in enumerate(ids) if h not in self.positions]
+        parts = []
+        if known:
+            parts.append(self.matrix[[self.positions[ids[i]] for i in known]])
+        if missing:
+            parts.append(self.transform([texts[i] for i in missing]))
+        stacked = sparse.vstack(parts, format="csr")
+        # Put the rows back into the caller's order
+        order = np.empty(len(texts), dtype=np.intp)
+        order[known + missing] = np.arange(len(texts))
+        return stacked[order]
+
+    def similarities(self, job_desc, vectors=None):
+        """Cosine similarity of the job description against `vectors` (default: whole index)."""
+        if vectors is None:
+            vectors = self.matrix
+        query = self.transform([job_desc])
+        # Rows are L2-normalised, so the dot product is the cosine similarity
+        return np.asarray((vectors @ query.T).todense()).ravel()
+
+    def scores(self, job_desc):
+        """Cosine similarity of the job description against every indexed resume."""
+        query = self.transform([job_desc])
+        if query.nnz == 0:
+            return np.zeros(len(self.ids), dtype=np.float32)
+        # Only the postings of the query's terms are touched, not the whole corpus
+        return self.postings[:, query.indices] @ query.data
+
+    def search(self, job_desc, k):
+        """Returns (total_matches, [(content_hash, score), ...]) for the k best resumes."""
+        scores = self.scores(job_desc)
+        candidates = np.flatnonzero(scores)
+        best = top_k(candidates, scores, k)
+        return len(candidates), [(self.ids[i], float(scores[i])) for i in best]
+
+
+def top_k(candidates, scores, k):
+    """Heap selection of the k highest-scoring candidates, best first (O(n log k))."""
+    return heapq.nlargest(k, candidates.tolist(), key=scores.__getitem__)
+
+
+def load_index(path):
+    """Loads the index at `path`, or returns None when it has not been built yet."""
+    if not os.path.exists(os.path.join(path, META_FILE)):
+        return None
+    try:
+        return TfidfIndex.load(path)
+    except Exception as e:
+        print(f"Error loading TF-IDF index from {path}: {e}")
+        return None
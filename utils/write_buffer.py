@@ -0,0 +1,111 @@
+import time
+import atexit
+import threading
+from collections import deque
+from pymongo.errors import BulkWriteError, ConnectionFailure, OperationFailure
+from utils.metrics import stage
+
+DUPLICATE_KEY = 11000
+
+
+class WriteBehindBuffer:
+    """Collects documents and writes them to a collection in unordered batches.
+
+    A daemon thread flushes every `flush_interval` seconds or as soon as
+    `batch_size` documents are waiting. The buffer is bounded: once
+    `max_pending` documents are queued, `add` flushes in the caller
+    (back-pressure) instead of growing without limit. Network failures are
+    retried with backoff; duplicate-key errors are expected (another worker
+    stored the same content first) and dropped. Pending documents are
+    flushed at interpreter exit.
+    """
+
+    def __init__(self, collection, batch_size=500, flush_interval=1.0, max_pending=10000, retries=3):
+        self.collection = collection
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.retries = retries
+        self._pending = deque()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._closed = False
+        atexit.register(self.close)
+
+    def __len__(self):
+        return len(self._pending)
+
+    def _ensure_flusher(self):
+        # Started lazily so the thread belongs to the (forked) process that writes
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+    def add(self, doc):
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("write buffer is closed")
+            self._pending.append(doc)
+            size = len(self._pending)
+            self._ensure_flusher()
+        if size >= self.max_pending:
+            self.flush()
+        elif size >= self.batch_size:
+            self._wakeup.set()
+
+    def _take_batch(self):
+        with self._lock:
+            count = min(self.batch_size, len(self._pending))
+            return [self._pending.popleft() for _ in range(count)]
+
+    def _requeue(self, docs):
+        with self._lock:
+            room = max(self.max_pending - len(self._pending), 0)
+            if room < len(docs):
+                print(f"Write buffer full: dropping {len(docs) - room} documents for {self.collection.name}")
+            self._pending.extendleft(reversed(docs[:room]))
+
+    def _write(self, docs):
+        """Inserts one batch; returns True when done (or only duplicates failed)."""
+        for attempt in range(self.retries + 1):
+            try:
+                with stage("db_insert"):
+                    self.collection.insert_many(docs, ordered=False)
+                return True
+            except BulkWriteError as e:
+                errors = e.details.get("writeErrors", [])
+                failed = [err for err in errors if err.get("code") != DUPLICATE_KEY]
+                for err in failed:
+                    print(f"Dropping document rejected by {self.collection.name}: {err.get('errmsg')}")
+                return True
+            except (ConnectionFailure, OperationFailure) as e:
+                if attempt == self.retries:
+                    print(f"Write to {self.collection.name} failed after {attempt + 1} attempts: {e}")
+                    return False
+                time.sleep(min(0.5 * 2 ** attempt, 5))
+        return False
+
+    def flush(self):
+        """Writes everything pending; documents that still fail are kept for the next flush."""
+        with self._flush_lock:
+            while True:
+                docs = self._take_batch()
+                if not docs:
+                    return
+                if not self._write(docs):
+                    self._requeue(docs)
+                    return
+
+    def close(self):
+        """Stops the flusher and writes whatever is still pending."""
+        self._closed = True
+        self._wakeup.set()
+        self.flush()
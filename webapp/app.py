@@ -1,24 +1,56 @@
 import os
-import pickle
-from flask import Flask, request, render_template, jsonify, redirect, url_for, session, send_from_directory, abort
+import sys
+import time
+import hashlib
+import threading
+from functools import partial
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from flask import Flask, request, render_template, jsonify, redirect, url_for, session, send_from_directory, abort, g, Response, stream_with_context
 from werkzeug.utils import secure_filename
-from pymongo import MongoClient
 from datetime import datetime , timezone
-import fitz  # PyMuPDF
+import numpy as np
 from sklearn.metrics.pairwise import cosine_similarity
 from sklearn.feature_extraction.text import TfidfVectorizer
 from flask_mail import Mail, Message
 from werkzeug.security import generate_password_hash, check_password_hash
 import uuid
+import json
+import mimetypes
+import unicodedata
 import flask
-from pymongo.errors import ConnectionFailure
+from urllib.parse import quote
+from werkzeug.security import safe_join
+from pymongo.errors import ConnectionFailure, DuplicateKeyError, PyMongoError
+
+# Shared modules live in the project root (utils/, pipeline/)
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+from utils.db import get_db, LazyCollection, ensure_indexes
+from utils.tfidf_index import load_index, top_k, META_FILE
+from utils.lsa_index import load_lsa_index
+from utils.model_store import default_model_path
+from utils.model_registry import ModelRegistry, LiveModel
+from utils.scoring import split_model, classify, cosine_scores
+from utils.extraction_pool import ExtractionPool
+from utils.extract_text import extract_upload as extract_upload_bytes
+from utils.jobs import ACTIVE_STATUSES, InProcessQueue, JobStore, JobWorkers, QueueFull
+from utils.write_buffer import WriteBehindBuffer
+from utils.result_cache import TTLCache, MongoCache, TieredCache, job_description_hash, cache_key
+from utils.blob_store import BlobStore
+from utils.skill_matcher import matcher_for
+from utils import metrics
+from utils.metrics import Counter, Histogram, SIZE_BUCKETS, stage
 # --- 1. SETUP ---
 
 app = Flask(__name__)
 # NOTE: use a strong secret from env in prod
 app.secret_key = os.environ.get('FLASK_SECRET_KEY', 'dev_only_change_me')
 
-# Always use an absolute path for uploads (single source of truth)
+# Always use an absolute path for uploads (single source of truth). Files are kept in a
+# content-addressed store under UPLOAD_FOLDER/blobs/ (utils/blob_store.py); flat files
+# from before it are still served until `python utils/blob_store.py migrate` moves them.
 UPLOAD_FOLDER = os.environ.get(
     "UPLOAD_FOLDER",
     os.path.join(os.path.dirname(os.path.abspath(__file__)), 'uploads')
@@ -29,6 +61,15 @@ ALLOWED_EXTENSIONS = {'txt', 'pdf'}
 # Optional: protect against huge uploads (e.g., 50 MB)
 app.config['MAX_CONTENT_LENGTH'] = 50 * 1024 * 1024
 
+# Downloads carry a strong ETag (the content hash) and support 304s and byte ranges.
+# DOWNLOAD_OFFLOAD hands the transfer itself to the front proxy: "x-accel" for nginx
+# (an `internal` location at DOWNLOAD_ACCEL_PREFIX aliased to UPLOAD_FOLDER) or
+# "x-sendfile" for Apache mod_xsendfile / lighttpd.
+DOWNLOAD_OFFLOAD = os.environ.get("DOWNLOAD_OFFLOAD", "").lower()
+DOWNLOAD_ACCEL_PREFIX = os.environ.get("DOWNLOAD_ACCEL_PREFIX", "/protected-uploads/")
+DOWNLOAD_MAX_AGE = int(os.environ.get("DOWNLOAD_MAX_AGE", "3600"))
+app.config['USE_X_SENDFILE'] = DOWNLOAD_OFFLOAD == "x-sendfile"
+
 # Detect Flask version to choose correct send_from_directory parameter
 FLASK_VERSION = tuple(map(int, flask.__version__.split('.')[:2]))
 USE_PATH_PARAM = FLASK_VERSION >= (3, 0)
@@ -45,24 +86,100 @@ mail = Mail(app)
 ADMIN_EMAIL = os.environ.get('ADMIN_EMAIL', 'admin@example.com')
 ADMIN_PASSWORD = generate_password_hash(os.environ.get('ADMIN_PASSWORD', 'adminpassword'))
 
-# MongoDB setup
-MONGO_URI = os.environ.get("MONGO_URI", "mongodb://localhost:27017/resume_screening")
-client = MongoClient(MONGO_URI)
-# If your URI includes a db name at the end, this picks it automatically; else fallback:
-DEFAULT_DB = os.environ.get("MONGO_DB", "resume_screening")
-db = client.get_database() if client.get_database().name else client[DEFAULT_DB]
-uploads_col = db["uploads"]
-users_collection = db["users"]
-contact_collection = db["contacts"]
-
+# MongoDB setup (shared connection pool and index definitions: utils/db.py).
+# Collection handles resolve the client lazily, so they stay valid in forked workers.
+db = get_db()
+uploads_col = LazyCollection("uploads")
+users_collection = LazyCollection("users")
+contact_collection = LazyCollection("contacts")
+jobs_col = LazyCollection("jobs")
+
+# Screening jobs (see /jobs): worker threads per process and how long job documents live.
+# Each process holds at most JOB_QUEUE_SIZE waiting jobs (with their uploads) and answers
+# 503 beyond that; queued or running jobs without an update for JOB_STALE_SECONDS lost
+# their worker and are marked failed.
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", "2"))
+JOB_TTL_SECONDS = int(os.environ.get("JOB_TTL_SECONDS", str(24 * 3600)))
+JOB_QUEUE_SIZE = int(os.environ.get("JOB_QUEUE_SIZE", "8"))
+JOB_STALE_SECONDS = int(os.environ.get("JOB_STALE_SECONDS", "1800"))
+JOB_RETRY_AFTER_SECONDS = 30
 
-# Load ML model with error handling
 try:
-    with open("model.pkl", "rb") as f:
-        model = pickle.load(f)
-except FileNotFoundError:
-    print("\n--- WARNING: model.pkl not found. Prediction endpoint will not work. ---\n")
-    model = None
+    ensure_indexes(db, job_ttl_seconds=JOB_TTL_SECONDS)
+except ConnectionFailure as e:
+    print(f"\n--- WARNING: could not create MongoDB indexes: {e} ---\n")
+
+# In-process LRU in front of the uploads collection: sha256 -> {stored_filename, text}
+TEXT_CACHE_SIZE = int(os.environ.get("TEXT_CACHE_SIZE", "1024"))
+# Extraction limits per upload (a 50 MB PDF should not produce unbounded text)
+MAX_EXTRACT_PAGES = int(os.environ.get("MAX_EXTRACT_PAGES", "50"))
+MAX_EXTRACT_CHARS = int(os.environ.get("MAX_EXTRACT_CHARS", "200000"))
+# Ranking result cache: scores per resume and per batch, keyed by the normalized job
+# description, the resume content hashes, the model version and the scoring mode.
+# RESULT_CACHE_SHARED=1 adds a MongoDB tier (score_cache collection) shared by all workers.
+RESULT_CACHE_SIZE = int(os.environ.get("RESULT_CACHE_SIZE", "10000"))
+RESULT_CACHE_TTL = int(os.environ.get("RESULT_CACHE_TTL", "3600"))
+RESULT_CACHE_SHARED = os.environ.get("RESULT_CACHE_SHARED", "0") == "1"
+
+# Serve the latest version of the model registry (pipeline/train_model.py publishes
+# into it); new versions are loaded in the background and swapped in without a
+# restart. MODEL_PATH / model.pkl is only used while the registry is empty.
+# Registry artifacts are memory-mapped, so workers share their pages.
+MODEL_REGISTRY_DIR = os.environ.get("MODEL_REGISTRY_DIR", os.path.join(PROJECT_ROOT, "models"))
+MODEL_POLL_SECONDS = float(os.environ.get("MODEL_POLL_SECONDS", "30"))
+MODEL_PATH = default_model_path()
+live_model = LiveModel(ModelRegistry(MODEL_REGISTRY_DIR), poll_interval=MODEL_POLL_SECONDS, fallback_path=MODEL_PATH)
+if live_model.current() is None:
+    print(f"\n--- WARNING: no model in {MODEL_REGISTRY_DIR} and {MODEL_PATH} not found. Prediction endpoint will not work. ---\n")
+MODEL_NOT_LOADED = "The prediction model is not loaded on the server. Please contact the administrator."
+
+# Corpus-level TF-IDF index built offline by pipeline/build_index.py.
+# Without it, ranking falls back to fitting a vectorizer per request.
+TFIDF_INDEX_DIR = os.environ.get("TFIDF_INDEX_DIR", os.path.join(PROJECT_ROOT, "indexes", "tfidf"))
+tfidf_index = load_index(TFIDF_INDEX_DIR)
+
+# Optional low-rank semantic index (pipeline/build_index.py --lsa). Similarity is scored
+# "sparse" (TF-IDF cosine), "dense" (LSA cosine) or "blend" (weighted sum of both);
+# requests choose with the `scoring` field, dense modes fall back to sparse without the index.
+LSA_INDEX_DIR = os.environ.get("LSA_INDEX_DIR", os.path.join(PROJECT_ROOT, "indexes", "lsa"))
+lsa_index = load_lsa_index(LSA_INDEX_DIR)
+SCORING_MODES = ("sparse", "dense", "blend")
+DEFAULT_SCORING = os.environ.get("SIMILARITY_SCORING", "sparse")
+BLEND_WEIGHT = float(os.environ.get("SIMILARITY_BLEND_WEIGHT", "0.5"))  # weight of the dense score
+# Row of each TF-IDF index entry in the LSA index (-1: not in it), for blended corpus search
+if tfidf_index is not None and lsa_index is not None and tfidf_index.ids != lsa_index.ids:
+    LSA_ROWS = np.array([lsa_index.positions.get(h, -1) for h in tfidf_index.ids], dtype=np.intp)
+else:
+    LSA_ROWS = None
+SEARCH_PAGE_SIZE = 20
+SEARCH_MAX_PAGE_SIZE = 100
+# Skill coverage (utils/skill_matcher.py) is reported with every result; SKILL_WEIGHT (or a
+# request's `skill_weight`, 0..1) also mixes it into the overall score
+SKILL_WEIGHT = float(os.environ.get("SKILL_WEIGHT", "0"))
+# Streaming /predict (?stream=1 or Accept: application/x-ndjson). It runs inside one
+# request, so the page only streams batches of up to STREAM_MAX_FILES files; larger
+# ones go through /jobs and cannot run into the gunicorn worker timeout.
+NDJSON = "application/x-ndjson"
+STREAM_MAX_FILES = int(os.environ.get("STREAM_MAX_FILES", "20"))
+
+def index_stamp(index, path):
+    """Identifies the loaded build of an index, so rebuilt indexes do not reuse cached scores."""
+    try:
+        return os.stat(os.path.join(path, META_FILE)).st_mtime_ns if index is not None else None
+    except OSError:
+        return None
+
+SCORING_CONTEXT = cache_key(index_stamp(tfidf_index, TFIDF_INDEX_DIR), index_stamp(lsa_index, LSA_INDEX_DIR), BLEND_WEIGHT)
+
+# Instrumentation, exposed on /metrics (per-stage timings: utils.metrics.stage)
+REQUEST_SECONDS = Histogram(
+    "resume_http_request_duration_seconds", "HTTP request latency.", ["endpoint", "method", "status"]
+)
+UPLOAD_BYTES = Counter("resume_upload_bytes_total", "Bytes of resume files received.", ["type"])
+UPLOADS = Counter("resume_uploads_total", "Uploaded resumes by outcome.", ["outcome"])
+PAGES_PARSED = Counter("resume_pdf_pages_parsed_total", "PDF pages parsed by text extraction.")
+BATCH_SIZE = Histogram("resume_batch_size", "Resumes per screening request or job.", ["source"], buckets=SIZE_BUCKETS)
+SCORE_CACHE = Counter("resume_score_cache_total", "Resumes scored or served from the result cache.", ["outcome"])
 
 # --- 2. HELPER FUNCTIONS ---
 
@@ -70,32 +187,253 @@ def allowed_file(filename):
     """Checks if a filename has an allowed extension."""
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
-def extract_text(file_path):
-    """Extracts text from a .txt or .pdf file."""
-    ext = os.path.splitext(file_path)[1].lower()
-    text = ""
+class LRUCache:
+    """Small thread-safe LRU mapping used for in-process caches."""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._data:
+                return None
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+text_cache = LRUCache(TEXT_CACHE_SIZE)
+# (stored filename, size, mtime) -> content hash, for download ETags of flat legacy files
+etag_cache = LRUCache(TEXT_CACHE_SIZE)
+# Stored filename -> blob digest (references never change, so hits stay valid)
+blob_store = BlobStore(UPLOAD_FOLDER, LazyCollection("stored_files"), LazyCollection("blobs"))
+blob_cache = LRUCache(TEXT_CACHE_SIZE)
+shared_score_cache = MongoCache(LazyCollection("score_cache"), RESULT_CACHE_TTL) if RESULT_CACHE_SHARED else None
+score_cache = TieredCache(TTLCache(RESULT_CACHE_SIZE, RESULT_CACHE_TTL), shared_score_cache)
+batch_cache = TieredCache(TTLCache(max(RESULT_CACHE_SIZE // 10, 1), RESULT_CACHE_TTL), shared_score_cache)
+extraction_pool = ExtractionPool()
+# Blob references are recorded in MongoDB in the background, after the files are written
+upload_writer = ThreadPoolExecutor(max_workers=2, thread_name_prefix="upload-writer")
+job_store = JobStore(jobs_col)
+try:
+    stale_jobs = job_store.fail_stale(JOB_STALE_SECONDS)
+    if stale_jobs:
+        print(f"Marked {stale_jobs} interrupted screening jobs as failed")
+except ConnectionFailure as e:
+    print(f"\n--- WARNING: could not check for interrupted jobs: {e} ---\n")
+# Upload documents are inserted by a background flusher with unordered insert_many
+upload_buffer = WriteBehindBuffer(uploads_col)
+
+def content_hash(data):
+    """Returns the SHA-256 hex digest of the uploaded bytes."""
+    return hashlib.sha256(data).hexdigest()
+
+def lookup_upload(digest):
+    """Finds a previously extracted upload by content hash (LRU first, then MongoDB)."""
+    cached = text_cache.get(digest)
+    if cached is not None:
+        return cached
+    doc = uploads_col.find_one(
+        {"content_hash": digest},
+        {"_id": 0, "stored_filename": 1, "text": 1}
+    )
+    if doc:
+        text_cache.put(digest, doc)
+    return doc
+
+def download_etag(filename, file_path):
+    """Strong ETag of a stored upload: its content hash, recorded at upload time or hashed once."""
+    stat = os.stat(file_path)
+    key = (filename, stat.st_size, stat.st_mtime_ns)
+    digest = etag_cache.get(key)
+    if digest is None:
+        doc = uploads_col.find_one({"stored_filename": filename}, {"_id": 0, "content_hash": 1})
+        if doc and doc.get("content_hash"):
+            digest = doc["content_hash"]
+        else:
+            # Not recorded (no extractable text) or not flushed yet
+            sha = hashlib.sha256()
+            with open(file_path, 'rb') as f:
+                for chunk in iter(lambda: f.read(1 << 20), b""):
+                    sha.update(chunk)
+            digest = sha.hexdigest()
+        etag_cache.put(key, digest)
+    return digest
+
+def attachment_names(filename):
+    """Content-Disposition parameters for filename, encoded the way send_file does it."""
     try:
-        if ext == '.txt':
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                text = f.read()
-        elif ext == '.pdf':
-            # Ensure the document is closed (avoids file-lock issues on Windows)
-            with fitz.open(file_path) as doc:
-                for page in doc:
-                    text += page.get_text()
-    except Exception as e:
-        print(f"Error extracting text from {file_path}: {e}")
-    return text
+        filename.encode("ascii")
+    except UnicodeEncodeError:
+        # ASCII fallback plus the RFC 5987 form for clients that understand it
+        simple = unicodedata.normalize("NFKD", filename).encode("ascii", "ignore").decode("ascii")
+        return {"filename": simple, "filename*": "UTF-8''" + quote(filename, safe="!#$&+-.^_`|~")}
+    return {"filename": filename}
+
+def store_upload(stored_filename, digest, data):
+    """Writes the bytes once per content hash and the reference file of stored_filename.
+
+    Both are on disk before the download URL is handed out, so any worker can serve it.
+    """
+    try:
+        with stage("file_write"):
+            blob_store.put(data, digest)
+            blob_store.add_ref(stored_filename, digest)
+        return True
+    except (OSError, ValueError) as e:
+        print(f"Error saving upload {stored_filename}: {e}")
+        return False
+
+def record_blob_ref(stored_filename, digest):
+    """Records the reference in MongoDB (reference counts for GC), off the request path."""
+    try:
+        blob_store.record(stored_filename, digest)
+    except PyMongoError as e:
+        print(f"Error recording upload {stored_filename}: {e}")
+
+def resolve_blob(stored_filename):
+    digest = blob_cache.get(stored_filename)
+    if digest is None:
+        digest = blob_store.resolve(stored_filename)
+        if digest is not None:
+            blob_cache.put(stored_filename, digest)
+    return digest
+
+def record_upload(original_filename, digest, data, text):
+    """Queues the MongoDB record of a freshly extracted upload and persists the file off the request path."""
+    unique_filename = f"{uuid.uuid4().hex[:8]}_{original_filename}"
+    record = {"stored_filename": unique_filename, "text": text}
+    if text.strip():
+        # Written behind in batches; if another worker stored the same bytes first,
+        # the unique content_hash index rejects this copy at flush time.
+        upload_buffer.add({
+            "original_filename": original_filename,
+            "stored_filename": unique_filename,
+            "content_hash": digest,
+            "text": text,
+            "uploaded_at": datetime.utcnow()
+        })
+    if store_upload(unique_filename, digest, data):
+        upload_writer.submit(record_blob_ref, unique_filename, digest)
+    text_cache.put(digest, record)
+    return record
+
+# Picklable by reference: the pool's processes import utils.extract_text, never this module
+extract_upload = partial(extract_upload_bytes, max_pages=MAX_EXTRACT_PAGES, max_chars=MAX_EXTRACT_CHARS)
+
+def extract_text(upload):
+    """Extracts text from an in-memory (filename, bytes) upload of a .txt or .pdf file."""
+    return extract_upload(upload)[0]
 
-def rank_resumes(job_desc, resumes):
+def rank_resumes(job_desc, resumes, content_hashes=None):
     """Calculates cosine similarity between a job description and a list of resumes."""
+    if tfidf_index is not None:
+        # Stable scores: fixed corpus IDF, stored rows for already indexed resumes
+        vectors = tfidf_index.vectors_for(resumes, content_hashes or [None] * len(resumes))
+        return tfidf_index.similarities(job_desc, vectors)
     vectorizer = TfidfVectorizer(stop_words='english')
     vectors = vectorizer.fit_transform([job_desc] + resumes)
     similarities = cosine_similarity(vectors[0:1], vectors[1:]).flatten()
     return similarities
 
+def scoring_mode(requested):
+    """The similarity mode to use for a request, or None if `requested` is not a known mode."""
+    mode = (requested or DEFAULT_SCORING).strip().lower()
+    if mode not in SCORING_MODES:
+        return None
+    if mode != "sparse" and lsa_index is None:
+        return "sparse"
+    return mode
+
+def dense_similarities(job_desc, resumes, content_hashes=None):
+    """LSA cosine similarity, reusing the stored vectors of indexed resumes; negative scores count as 0."""
+    vectors = lsa_index.vectors_for(resumes, content_hashes or [None] * len(resumes))
+    return np.maximum(lsa_index.similarities(job_desc, vectors), 0.0)
+
+def blend_scores(sparse_scores, dense_scores):
+    return (1.0 - BLEND_WEIGHT) * np.asarray(sparse_scores) + BLEND_WEIGHT * np.asarray(dense_scores)
+
+def score_resumes(served, job_desc, resumes, content_hashes, scoring="sparse"):
+    """Returns (predictions, confidences, similarities), vectorizing each resume only once."""
+    model = served.model
+    featurizer, classifier = split_model(model)
+    if featurizer is None:
+        with stage("predict"):
+            predictions = model.predict(resumes)
+        with stage("predict_proba"):
+            confidences = model.predict_proba(resumes).max(axis=1) if hasattr(model, "predict_proba") else [1.0] * len(predictions)
+        similarities = None
+        if scoring != "dense":
+            with stage("rank_resumes"):
+                similarities = rank_resumes(job_desc, resumes, content_hashes)
+        return predictions, confidences, with_dense_scores(similarities, job_desc, resumes, content_hashes, scoring)
+
+    with stage("vectorize"):
+        if tfidf_index is not None and tfidf_index.model_id == served.model_id:
+            # Index rows are already in the model's feature space: indexed resumes are not re-tokenized
+            features = tfidf_index.vectors_for(resumes, content_hashes)
+        else:
+            features = featurizer.transform(resumes)
+    with stage("classify"):
+        predictions, confidences = classify(classifier, features)
+    similarities = None
+    if scoring != "dense":
+        with stage("similarity"):
+            similarities = cosine_scores(features, featurizer.transform([job_desc]))
+    return predictions, confidences, with_dense_scores(similarities, job_desc, resumes, content_hashes, scoring)
+
+def with_dense_scores(sparse_scores, job_desc, resumes, content_hashes, scoring):
+    """The final similarities for a scoring mode, given the sparse ones (None in dense mode)."""
+    if scoring == "sparse":
+        return sparse_scores
+    with stage("dense_similarity"):
+        dense = dense_similarities(job_desc, resumes, content_hashes)
+    return dense if scoring == "dense" else blend_scores(sparse_scores, dense)
+
+def corpus_search(job_desc, k, scoring):
+    """(total_matches, [(content_hash, score), ...]) of the k best indexed resumes."""
+    if scoring == "sparse":
+        return tfidf_index.search(job_desc, k)
+    if scoring == "dense":
+        return lsa_index.search(job_desc, k)
+    dense = np.maximum(lsa_index.scores(job_desc), 0.0)
+    if LSA_ROWS is not None:
+        # The two indexes were built from different snapshots: align the dense scores by content hash
+        dense = np.where(LSA_ROWS >= 0, dense[LSA_ROWS], 0.0)
+    scores = blend_scores(tfidf_index.scores(job_desc), dense)
+    candidates = np.flatnonzero(scores > 0)
+    best = top_k(candidates, scores, k)
+    return len(candidates), [(tfidf_index.ids[i], float(scores[i])) for i in best]
+
 # --- 3. CORE FLASK ROUTES ---
 
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+    metrics.begin_request()
+    metrics.start_exporter()
+
+@app.after_request
+def record_request_timing(response):
+    elapsed = time.perf_counter() - g.get("request_start", time.perf_counter())
+    REQUEST_SECONDS.observe(
+        elapsed, endpoint=request.endpoint or "unmatched", method=request.method, status=response.status_code
+    )
+    response.headers["Server-Timing"] = metrics.server_timing(metrics.request_timings(), elapsed)
+    return response
+
+@app.route('/metrics')
+def metrics_endpoint():
+    """Prometheus scrape endpoint."""
+    return Response(metrics.exposition(), mimetype="text/plain; version=0.0.4")
+
 @app.route('/')
 def index():
     return render_template('index.html')
@@ -104,91 +442,464 @@ def index():
 def resume():
     if 'user' not in session:
         return redirect(url_for('signin'))
-    model_loaded = model is not None
-    return render_template('resume.html', model_loaded=model_loaded)
+    model_loaded = live_model.current() is not None
+    return render_template('resume.html', model_loaded=model_loaded, stream_max_files=STREAM_MAX_FILES)
+
+def read_uploads(files):
+    """Reads the allowed files of a multipart request into (secure filename, bytes) pairs."""
+    uploads = []
+    with stage("read"):
+        for file in files:
+            if file and allowed_file(file.filename):
+                data = file.read()
+                # Typed by the original name: secure_filename drops non-ASCII stems
+                # ("简历.pdf" becomes "pdf"), allowed_file has checked this one
+                UPLOAD_BYTES.inc(len(data), type=file.filename.rsplit('.', 1)[1].lower())
+                uploads.append((secure_filename(file.filename), data))
+    return uploads
+
+def dedupe_uploads(uploads):
+    """Returns ([(filename, digest)] per upload, {digest: known record}, {digest: upload to extract})."""
+    hashed = []
+    records = {}
+    new_uploads = {}
+
+    with stage("dedupe_lookup"):
+        for original_filename, data in uploads:
+            # Identical bytes reuse the stored file and extracted text
+            digest = content_hash(data)
+            hashed.append((original_filename, digest))
+            if digest in records or digest in new_uploads:
+                continue
+            record = lookup_upload(digest)
+            if record is not None:
+                records[digest] = record
+            else:
+                new_uploads[digest] = (original_filename, data)
+    UPLOADS.inc(len(uploads) - len(new_uploads), outcome="cached")
+    UPLOADS.inc(len(new_uploads), outcome="extracted")
+    return hashed, records, new_uploads
+
+def resume_entry(original_filename, digest, record):
+    """The resume passed on to scoring, or None when no text could be extracted."""
+    if not record["text"].strip():
+        return None
+    return {
+        "text": record["text"],
+        "original_name": original_filename,
+        "unique_name": record["stored_filename"],
+        "content_hash": digest
+    }
+
+def ingest_uploads(uploads, progress=None):
+    """Extracts (or reuses cached) text for each upload and returns the non-empty resumes.
+
+    `progress(n)` is called with the number of uploads handled so far.
+    """
+    hashed, records, new_uploads = dedupe_uploads(uploads)
+
+    done = len(uploads) - len(new_uploads)
+    if progress:
+        progress(done)
+
+    # Parse the new files from memory in parallel; a malformed PDF times out instead of stalling the batch
+    pending = list(new_uploads.items())
+    # Jobs extract in small chunks so progress moves; a plain request does one parallel map
+    chunk_size = max(extraction_pool.processes, 1) * 2 if progress else max(len(pending), 1)
+    for start in range(0, len(pending), chunk_size):
+        chunk = pending[start:start + chunk_size]
+        with stage("extract"):
+            extracted = extraction_pool.map(
+                extract_upload,
+                [upload for _, upload in chunk],
+                default=("", 0),
+                names=[original_filename for _, (original_filename, _) in chunk]
+            )
+        PAGES_PARSED.inc(sum(pages for _, pages in extracted))
+        with stage("store"):
+            for (digest, (original_filename, data)), (text, _) in zip(chunk, extracted):
+                records[digest] = record_upload(original_filename, digest, data, text)
+        done += len(chunk)
+        if progress:
+            progress(done)
+
+    resume_data = [resume_entry(original_filename, digest, records[digest]) for original_filename, digest in hashed]
+    return [entry for entry in resume_data if entry is not None]
+
+def iter_ingested(uploads):
+    """Streaming ingest_uploads: yields one resume entry (None if it has no text) per upload as soon as it is ready.
+
+    Already known uploads come first; new files follow in upload order as their extraction finishes.
+    """
+    hashed, records, new_uploads = dedupe_uploads(uploads)
+    waiting = {}
+    for original_filename, digest in hashed:
+        if digest in records:
+            yield resume_entry(original_filename, digest, records[digest])
+        else:
+            waiting.setdefault(digest, []).append(original_filename)
+
+    pending = list(new_uploads.items())
+    extracted = extraction_pool.imap(
+        extract_upload,
+        [upload for _, upload in pending],
+        default=("", 0),
+        names=[original_filename for _, (original_filename, _) in pending]
+    )
+    for (digest, (original_filename, data)), (text, pages) in zip(pending, extracted):
+        PAGES_PARSED.inc(pages)
+        with stage("store"):
+            record = record_upload(original_filename, digest, data, text)
+        for name in waiting[digest]:
+            yield resume_entry(name, digest, record)
+
+def cached_scores(served, job_desc, resume_data, scoring):
+    """[prediction, confidence, similarity] per resume; only resumes missing from the result cache are scored."""
+    hashes = [r['content_hash'] for r in resume_data]
+    context = (served.version, scoring, SCORING_CONTEXT, job_description_hash(job_desc))
+    batch_key = cache_key("batch", *context, *hashes)
+    with stage("cache_lookup"):
+        cached = batch_cache.get(batch_key)
+    if cached is not None:
+        SCORE_CACHE.inc(len(hashes), outcome="batch_hit")
+        return cached
+
+    # Without a featurizer or index, sparse similarity is fitted on the batch itself,
+    # so a resume's score depends on the rest of the batch: only whole batches are reused
+    per_resume = split_model(served.model)[0] is not None or tfidf_index is not None or scoring == "dense"
+    keys = [cache_key("resume", *context, h) for h in hashes]
+    found = {}
+    if per_resume:
+        with stage("cache_lookup"):
+            found, shared_hits = score_cache.get_many(keys)
+        SCORE_CACHE.inc(len(found) - shared_hits, outcome="hit")
+        SCORE_CACHE.inc(shared_hits, outcome="shared_hit")
+
+    missing = [i for i, key in enumerate(keys) if key not in found]
+    if missing:
+        SCORE_CACHE.inc(len(missing), outcome="miss")
+        predictions, confidences, similarities = score_resumes(
+            served,
+            job_desc,
+            [resume_data[i]['text'] for i in missing],
+            [hashes[i] for i in missing],
+            scoring
+        )
+        fresh = {
+            keys[i]: [str(prediction), float(confidence), float(similarity)]
+            for i, prediction, confidence, similarity in zip(missing, predictions, confidences, similarities)
+        }
+        found.update(fresh)
+        if per_resume:
+            score_cache.put_many(fresh)
+
+    scores = [found[key] for key in keys]
+    batch_cache.put(batch_key, scores)
+    return scores
+
+def skill_weight_param(value):
+    """The skill weight of a request (SKILL_WEIGHT if absent), or None if it is not a number in [0, 1]."""
+    if value is None or value == "":
+        return SKILL_WEIGHT
+    try:
+        weight = float(value)
+    except ValueError:
+        return None
+    return weight if 0.0 <= weight <= 1.0 else None
+
+def combined_score(confidence, similarity, skills, skill_weight):
+    score = (confidence + similarity) / 2
+    if skill_weight and skills["matched"] + skills["missing"]:
+        # No required skills found in the job description: coverage says nothing
+        score = (1.0 - skill_weight) * score + skill_weight * skills["coverage"]
+    return float(score)
+
+def rank_results(served, job_desc, resume_data, scoring="sparse", skill_weight=SKILL_WEIGHT):
+    """Classifies and scores the resumes with one model snapshot, returning them ranked by combined score."""
+    scores = cached_scores(served, job_desc, resume_data, scoring)
+    # One automaton per job description (cached), one pass over each resume
+    matcher = matcher_for(job_desc)
+    with stage("skills"):
+        skills = [matcher.match(data['text']) for data in resume_data]
 
-@app.route('/predict', methods=['POST'])
-def predict():
-    """Processes uploaded resumes, predicts categories, ranks them, and returns results."""
-    if model is None:
-        return jsonify({"error": "The prediction model is not loaded on the server. Please contact the administrator."}), 500
+    results = []
+    for data, (prediction, confidence, similarity), matched in zip(resume_data, scores, skills):
+        results.append({
+            "name": data['original_name'],
+            "prediction": prediction,
+            "confidence": float(confidence),
+            "similarity": float(similarity),
+            "skills": matched,
+            "score": combined_score(confidence, similarity, matched, skill_weight),
+            "stored_filename": data['unique_name']
+        })
 
-    job_desc = request.form.get("job_description", "")
-    files = request.files.getlist("resumes")
+    results.sort(key=lambda x: x['score'], reverse=True)
+    return [{**res, "rank": i + 1} for i, res in enumerate(results)]
+
+def with_download_urls(results):
+    """Replaces the stored filename of each result by its download URL (needs a request context)."""
+    return [
+        {**{k: v for k, v in res.items() if k != "stored_filename"},
+         "download_url": url_for('download_resume', filename=res["stored_filename"])}
+        for res in results
+    ]
+
+def run_screening_job(job_id, payload):
+    """Job worker: the same pipeline as /predict, reporting progress to the job store."""
+    job_desc, uploads, scoring, skill_weight = payload
+    try:
+        served = live_model.current()
+        BATCH_SIZE.observe(len(uploads), source="job")
+        job_store.start(job_id)
+        resume_data = ingest_uploads(uploads, progress=lambda done: job_store.progress(job_id, done))
+        if not resume_data:
+            job_store.fail(job_id, "No valid resumes were uploaded or text could not be extracted.")
+            return
+        job_store.finish(job_id, rank_results(served, job_desc, resume_data, scoring, skill_weight), model_version=served.version)
+    except Exception as e:
+        print(f"Screening job {job_id} failed: {e}")
+        job_store.fail(job_id, "Screening failed on the server.")
+
+job_workers = JobWorkers(InProcessQueue(JOB_QUEUE_SIZE), run_screening_job, workers=JOB_WORKERS)
+
+def wants_stream():
+    return request.args.get("stream") == "1" or request.accept_mimetypes.best == NDJSON
 
+def ndjson(record):
+    return json.dumps(record) + "\n"
+
+def stream_results(served, job_desc, uploads, scoring, skill_weight):
+    """NDJSON body of a streaming /predict: a "result" line per resume as soon as it is scored
+    (or a "progress" line for files without text), then one "ranking" line with the final
+    ranks. Provisional scores may differ slightly from the ranking's when similarity is fitted
+    on the whole batch; the ranking line is authoritative."""
+    total = len(uploads)
     resume_data = []
+    matcher = matcher_for(job_desc)
+    for processed, entry in enumerate(iter_ingested(uploads), start=1):
+        if entry is None:
+            yield ndjson({"type": "progress", "processed": processed, "total": total})
+            continue
+        resume_data.append(entry)
+        prediction, confidence, similarity = cached_scores(served, job_desc, [entry], scoring)[0]
+        with stage("skills"):
+            skills = matcher.match(entry['text'])
+        yield ndjson({
+            "type": "result",
+            "processed": processed,
+            "total": total,
+            "result": {
+                "name": entry['original_name'],
+                "prediction": prediction,
+                "confidence": float(confidence),
+                "similarity": float(similarity),
+                "skills": skills,
+                "score": combined_score(confidence, similarity, skills, skill_weight),
+                "download_url": url_for('download_resume', filename=entry['unique_name'])
+            }
+        })
 
-    for file in files:
-        if file and allowed_file(file.filename):
-            # Secure once, then prepend a short UUID
-            original_filename = secure_filename(file.filename)
-            unique_filename = f"{uuid.uuid4().hex[:8]}_{original_filename}"
-            file_path = os.path.join(app.config['UPLOAD_FOLDER'], unique_filename)
-            file.save(file_path)
-
-            text = extract_text(file_path)
-            if text.strip():
-                resume_data.append({
-                    "text": text,
-                    "original_name": original_filename,
-                    "unique_name": unique_filename
-                })
-                uploads_col.insert_one({
-                    "original_filename": original_filename,
-                    "stored_filename": unique_filename,
-                    "text": text,
-                    "uploaded_at": datetime.utcnow()
-                })
+    if not resume_data:
+        yield ndjson({"type": "error", "error": "No valid resumes were uploaded or text could not be extracted."})
+        return
+    # Per-resume scores are cached by now, so this only re-scores when similarity depends on the batch
+    yield ndjson({
+        "type": "ranking",
+        "results": with_download_urls(rank_results(served, job_desc, resume_data, scoring, skill_weight)),
+        "model_version": served.version,
+        "scoring": scoring,
+        "required_skills": matcher.skills
+    })
 
+@app.route('/predict', methods=['POST'])
+def predict():
+    """Processes uploaded resumes, predicts categories, ranks them, and returns results."""
+    # One snapshot per request: a reload mid-request does not mix model versions
+    served = live_model.current()
+    if served is None:
+        return jsonify({"error": MODEL_NOT_LOADED}), 500
+    scoring = scoring_mode(request.form.get("scoring"))
+    if scoring is None:
+        return jsonify({"error": f"scoring must be one of: {', '.join(SCORING_MODES)}."}), 400
+    skill_weight = skill_weight_param(request.form.get("skill_weight"))
+    if skill_weight is None:
+        return jsonify({"error": "skill_weight must be a number between 0 and 1."}), 400
+
+    job_desc = request.form.get("job_description", "")
+    uploads = read_uploads(request.files.getlist("resumes"))
+    BATCH_SIZE.observe(len(uploads), source="predict")
+    if wants_stream():
+        response = Response(stream_with_context(stream_results(served, job_desc, uploads, scoring, skill_weight)), mimetype=NDJSON)
+        # Let a buffering proxy (nginx) pass each line through as it is written
+        response.headers["X-Accel-Buffering"] = "no"
+        return response
+    resume_data = ingest_uploads(uploads)
     if not resume_data:
         return jsonify({"error": "No valid resumes were uploaded or text could not be extracted."}), 400
 
-    resume_texts = [r['text'] for r in resume_data]
-    predictions = model.predict(resume_texts)
-    confidences = model.predict_proba(resume_texts).max(axis=1) if hasattr(model, "predict_proba") else [1.0] * len(predictions)
-    similarities = rank_resumes(job_desc, resume_texts)
+    return jsonify({
+        "results": with_download_urls(rank_results(served, job_desc, resume_data, scoring, skill_weight)),
+        "model_version": served.version,
+        "scoring": scoring,
+        "required_skills": matcher_for(job_desc).skills
+    })
+
+@app.route('/jobs', methods=['POST'])
+def submit_job():
+    """Queues a screening batch and returns its job id immediately (poll /jobs/<job_id>)."""
+    if live_model.current() is None:
+        return jsonify({"error": MODEL_NOT_LOADED}), 500
+    scoring = scoring_mode(request.form.get("scoring"))
+    if scoring is None:
+        return jsonify({"error": f"scoring must be one of: {', '.join(SCORING_MODES)}."}), 400
+    skill_weight = skill_weight_param(request.form.get("skill_weight"))
+    if skill_weight is None:
+        return jsonify({"error": "skill_weight must be a number between 0 and 1."}), 400
 
+    job_desc = request.form.get("job_description", "")
+    uploads = read_uploads(request.files.getlist("resumes"))
+    if not uploads:
+        return jsonify({"error": "No valid resumes were uploaded."}), 400
+
+    job_id = job_store.create(total=len(uploads))
+    try:
+        job_workers.submit(job_id, (job_desc, uploads, scoring, skill_weight))
+    except QueueFull:
+        job_store.fail(job_id, "The server was too busy to queue the job.")
+        response = jsonify({"error": "Too many screening jobs are waiting. Please try again shortly."})
+        response.headers["Retry-After"] = str(JOB_RETRY_AFTER_SECONDS)
+        return response, 503
+    return jsonify({
+        "job_id": job_id,
+        "status": "queued",
+        "scoring": scoring,
+        "status_url": url_for('job_status', job_id=job_id)
+    }), 202
+
+@app.route('/jobs/<job_id>')
+def job_status(job_id):
+    """Reports a job's status and progress, plus its ranked results once done."""
+    job = job_store.get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown job."}), 404
+    if job["status"] in ACTIVE_STATUSES and job_store.fail_stale(JOB_STALE_SECONDS, job_id):
+        # Its worker is gone (e.g. restarted mid-job): report it as failed
+        job = job_store.get(job_id)
+
+    response = {
+        "job_id": job_id,
+        "status": job["status"],
+        "processed": job.get("processed", 0),
+        "total": job.get("total", 0)
+    }
+    if job["status"] == "done":
+        response["results"] = with_download_urls(job["results"])
+        response["model_version"] = job.get("model_version")
+    elif job["status"] == "failed":
+        response["error"] = job.get("error")
+    return jsonify(response)
+
+@app.route('/search', methods=['GET', 'POST'])
+def search():
+    """Ranks a job description against every previously screened resume (paginated)."""
+    if 'user' not in session:
+        return jsonify({"error": "Please sign in to search past candidates."}), 401
+    scoring = scoring_mode(request.values.get("scoring"))
+    if scoring is None:
+        return jsonify({"error": f"scoring must be one of: {', '.join(SCORING_MODES)}."}), 400
+    if tfidf_index is None and lsa_index is not None:
+        scoring = "dense"
+    elif tfidf_index is None:
+        return jsonify({"error": "The candidate index has not been built yet. Run pipeline/build_index.py."}), 503
+
+    job_desc = request.values.get("job_description", "").strip()
+    if not job_desc:
+        return jsonify({"error": "A job description is required."}), 400
+    page = max(request.values.get("page", 1, type=int), 1)
+    per_page = min(max(request.values.get("per_page", SEARCH_PAGE_SIZE, type=int), 1), SEARCH_MAX_PAGE_SIZE)
+
+    # No page can start past the last indexed resume, which also bounds the top-k heap below
+    indexed = len(lsa_index if scoring == "dense" else tfidf_index)
+    if page > 1 and (page - 1) * per_page >= indexed:
+        return jsonify({"error": f"page must be at most {max(-(-indexed // per_page), 1)} for per_page={per_page}."}), 400
+
+    # Heap-select only as many hits as needed to fill the requested page
+    total, hits = corpus_search(job_desc, min(page * per_page, indexed), scoring)
+    hits = hits[(page - 1) * per_page:]
+
+    docs = {
+        doc["content_hash"]: doc
+        for doc in uploads_col.find(
+            {"content_hash": {"$in": [h for h, _ in hits]}},
+            {"_id": 0, "content_hash": 1, "original_filename": 1, "stored_filename": 1, "uploaded_at": 1}
+        )
+    }
     results = []
-    for i, data in enumerate(resume_data):
-        combined_score = (confidences[i] + similarities[i]) / 2
-        download_url = url_for('download_resume', filename=data['unique_name'])
+    for offset, (digest, score) in enumerate(hits):
+        doc = docs.get(digest, {})
+        stored = doc.get("stored_filename")
         results.append({
-            "name": data['original_name'],
-            "prediction": predictions[i],
-            "confidence": float(confidences[i]),
-            "similarity": float(similarities[i]),
-            "score": float(combined_score),
-            "download_url": download_url
+            "rank": (page - 1) * per_page + offset + 1,
+            "name": doc.get("original_filename", stored),
+            "similarity": score,
+            "uploaded_at": doc["uploaded_at"].isoformat() if doc.get("uploaded_at") else None,
+            "download_url": url_for('download_resume', filename=stored) if stored else None
         })
-
-    results.sort(key=lambda x: x['score'], reverse=True)
-    ranked_results = [{**res, "rank": i + 1} for i, res in enumerate(results)]
-    return jsonify({"results": ranked_results})
+    return jsonify({"results": results, "page": page, "per_page": per_page, "total": total, "scoring": scoring})
 
 # --- Download route (Flask 2.x & 3.x compatible) ---
 @app.route('/download/<filename>')
 def download_resume(filename):
-    """Serves a file for download from the UPLOAD_FOLDER."""
-    file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
+    """Serves a stored upload for download, from the blob store or a legacy flat file."""
+    digest = resolve_blob(filename)
+    if digest is not None:
+        file_path = blob_store.path_for(digest)
+        accel_path = blob_store.relative_path(digest)
+        etag = digest
+    else:
+        file_path = safe_join(app.config['UPLOAD_FOLDER'], filename)
+        accel_path = quote(filename)
 
     # Check if the file exists before sending
-    if not os.path.isfile(file_path):
+    if file_path is None or not os.path.isfile(file_path):
         abort(404, description=f"Resume '{filename}' not found.")
-
-    if USE_PATH_PARAM:
+    if digest is None:
+        etag = download_etag(filename, file_path)
+    directory, name = os.path.split(file_path)
+
+    if DOWNLOAD_OFFLOAD == "x-accel":
+        # nginx streams the file (and serves ranges); only validators are answered here
+        response = Response(mimetype=mimetypes.guess_type(filename)[0] or "application/octet-stream")
+        response.headers["X-Accel-Redirect"] = DOWNLOAD_ACCEL_PREFIX.rstrip("/") + "/" + accel_path
+        response.headers.set("Content-Disposition", "attachment", **attachment_names(filename))
+        response.set_etag(etag)
+        response = response.make_conditional(request)
+    elif USE_PATH_PARAM:
         # Flask 3.x+ uses 'path'
-        return send_from_directory(
-            directory=app.config['UPLOAD_FOLDER'],
-            path=filename,
-            as_attachment=True
+        response = send_from_directory(
+            directory=directory,
+            path=name,
+            as_attachment=True,
+            download_name=filename,
+            etag=etag,
+            max_age=DOWNLOAD_MAX_AGE
         )
     else:
         # Flask 2.x uses 'filename'
-        return send_from_directory(
-            directory=app.config['UPLOAD_FOLDER'],
-            filename=filename,
-            as_attachment=True
+        response = send_from_directory(
+            directory=directory,
+            filename=name,
+            as_attachment=True,
+            download_name=filename,
+            etag=etag,
+            max_age=DOWNLOAD_MAX_AGE
         )
+    # Resumes are personal data: browsers may cache them, shared proxies may not
+    response.cache_control.public = False
+    response.cache_control.private = True
+    response.cache_control.max_age = DOWNLOAD_MAX_AGE
+    return response
 
 # --- 4. USER AND CONTACT ROUTES ---
 
@@ -238,12 +949,16 @@ def signup():
         if users_collection.find_one({"email": email}):
             return "An account with this email already exists.", 400
 
-        users_collection.insert_one({
-            "name": name,
-            "email": email,
-            "mobile": mobile,
-            "password": generate_password_hash(password)
-        })
+        try:
+            users_collection.insert_one({
+                "name": name,
+                "email": email,
+                "mobile": mobile,
+                "password": generate_password_hash(password)
+            })
+        except DuplicateKeyError:
+            # Unique email index: a concurrent sign-up with the same email won the race
+            return "An account with this email already exists.", 400
         return redirect(url_for('signin'))
     return render_template('signup.html')
 
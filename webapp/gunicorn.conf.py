@@ -0,0 +1,23 @@
+# Gunicorn settings (used by the Dockerfile: gunicorn -c gunicorn.conf.py ...)
+import gc
+import sys
+
+# Import the app, and with it the memory-mapped model and TF-IDF index, once in
+# the master. Forked workers then share those pages copy-on-write instead of
+# each loading a private copy, and start serving without a cold load.
+preload_app = True
+
+
+def pre_fork(server, worker):
+    # Move the preloaded objects into the permanent generation so the workers'
+    # garbage collector never writes to (and thereby un-shares) their pages.
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    # Start the worker's extraction pool (utils/extraction_pool.py) before it takes
+    # requests, so the first upload does not wait for the fork server and its processes.
+    app = worker.app.wsgi()
+    pool = getattr(sys.modules.get(app.import_name), "extraction_pool", None)
+    if pool is not None:
+        pool.start()